@@ -0,0 +1,193 @@
+"""
+Pooled HTTP client for the Jarvis bridge AI backends.
+
+One AIBackendClient is shared by every chat request, so TCP+TLS connections to
+the inference endpoint are kept alive and reused instead of being opened for
+every message. Each call records connect / TTFB / total timings.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Status codes worth retrying (rate limited, model loading, gateway errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Time spent opening a new connection on this thread (None if one was reused)
+_connect_timing = threading.local()
+
+
+def _timed_connect(connect):
+    """Wrap a connection's connect() so the handshake time is recorded"""
+    def wrapper(self):
+        start = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            _connect_timing.seconds = time.perf_counter() - start
+    return wrapper
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use connections that time their handshake"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class AIBackendClient:
+    """Keep-alive, pooled HTTP client with timeout budgets and retries"""
+
+    def __init__(self, pool_size=10, connect_timeout=5.0, read_timeout=30.0,
+                 total_timeout=45.0, max_retries=2, backoff=0.5):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        # Retries are done in post() so they respect the total timeout budget
+        adapter = _TimedAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'errors': 0,
+            'retries': 0,
+            'new_connections': 0,
+            'reused_connections': 0,
+            'connect_seconds': 0.0,
+            'ttfb_seconds': 0.0,
+            'total_seconds': 0.0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """Build a client from AI_* environment variables"""
+        return cls(
+            pool_size=int(os.environ.get('AI_POOL_SIZE', 10)),
+            connect_timeout=float(os.environ.get('AI_CONNECT_TIMEOUT', 5)),
+            read_timeout=float(os.environ.get('AI_READ_TIMEOUT', 30)),
+            total_timeout=float(os.environ.get('AI_TOTAL_TIMEOUT', 45)),
+            max_retries=int(os.environ.get('AI_MAX_RETRIES', 2)),
+            backoff=float(os.environ.get('AI_RETRY_BACKOFF', 0.5)),
+        )
+
+    @property
+    def last_timings(self):
+        """Timings of the last call made on the current thread"""
+        return getattr(self._local, 'timings', None)
+
+    def post(self, url, **kwargs):
+        """POST with connection reuse, retries with backoff and a total deadline"""
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, stream=False, **kwargs):
+        """Send a request through the pool; stream=True leaves the body unread"""
+        deadline = time.perf_counter() + self.total_timeout
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self._record(None, error=True)
+                raise requests.exceptions.Timeout(f"AI backend timeout budget of {self.total_timeout}s exhausted")
+
+            timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+            try:
+                response, timings = self._send(method, url, timeout, stream, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not self._should_retry(attempt, deadline):
+                    self._record(None, error=True)
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or not self._should_retry(attempt, deadline):
+                    timings['attempts'] = attempt + 1
+                    self._local.timings = timings
+                    self._record(timings)
+                    return response
+                response.close()
+
+            attempt += 1
+            with self._lock:
+                self._stats['retries'] += 1
+            # Exponential backoff with jitter, never sleeping past the deadline
+            delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+            time.sleep(max(0.0, min(delay, deadline - time.perf_counter())))
+
+    def _should_retry(self, attempt, deadline):
+        return attempt < self.max_retries and time.perf_counter() < deadline
+
+    def _send(self, method, url, timeout, stream, **kwargs):
+        _connect_timing.seconds = None
+        start = time.perf_counter()
+        # stream=True so the headers arrive before the body is read (TTFB)
+        response = self.session.request(method, url, timeout=timeout, stream=True, **kwargs)
+        ttfb = time.perf_counter() - start
+        if not stream:
+            response.content  # read the body so the connection goes back to the pool
+        connect = _connect_timing.seconds
+        timings = {
+            'connect': connect,
+            'reused_connection': connect is None,
+            'ttfb': ttfb,
+            'total': time.perf_counter() - start,
+        }
+        return response, timings
+
+    def _record(self, timings, error=False):
+        with self._lock:
+            self._stats['requests'] += 1
+            if error:
+                self._stats['errors'] += 1
+                return
+            if timings['reused_connection']:
+                self._stats['reused_connections'] += 1
+            else:
+                self._stats['new_connections'] += 1
+                self._stats['connect_seconds'] += timings['connect']
+            self._stats['ttfb_seconds'] += timings['ttfb']
+            self._stats['total_seconds'] += timings['total']
+
+    def stats(self):
+        """Aggregate counters and average timings (seconds) for /api/status"""
+        with self._lock:
+            stats = dict(self._stats)
+        ok = stats['requests'] - stats['errors']
+        stats['avg_connect'] = stats['connect_seconds'] / stats['new_connections'] if stats['new_connections'] else None
+        stats['avg_ttfb'] = stats['ttfb_seconds'] / ok if ok else None
+        stats['avg_total'] = stats['total_seconds'] / ok if ok else None
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,151 @@
+"""
+In-memory audio normalization for voice input.
+
+Uploaded recordings are decoded straight from memory into 16 kHz mono 16-bit
+PCM, which is what speech recognition wants, without temporary files:
+
+1. WAV uploads are parsed and resampled in-process (stdlib wave + NumPy)
+2. Other formats (WebM/Opus, OGG, MP4...) are decoded in-process with PyAV
+3. Without PyAV, ffmpeg is fed through pipes instead of temp files
+4. Finally pydub is tried, reading from a memory buffer
+"""
+
+import io
+import subprocess
+import wave
+
+try:
+    import numpy as np
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+try:
+    import av
+    av_available = True
+    print("✅ PyAV in-process audio decoder available!")
+except ImportError:
+    av_available = False
+
+try:
+    from pydub import AudioSegment
+    pydub_available = True
+except ImportError:
+    pydub_available = False
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes, int16
+CHANNELS = 1
+
+
+class AudioDecodeError(Exception):
+    pass
+
+
+def decode_to_pcm(data):
+    """Decode an uploaded recording (bytes) to 16 kHz mono int16 PCM bytes"""
+    if not data:
+        raise AudioDecodeError("Empty audio upload")
+
+    errors = []
+    decoders = []
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE' and numpy_available:
+        decoders.append(('wav', _decode_wav))
+    if av_available:
+        decoders.append(('pyav', _decode_av))
+    decoders.append(('ffmpeg', _decode_ffmpeg))
+    if pydub_available:
+        decoders.append(('pydub', _decode_pydub))
+
+    for name, decoder in decoders:
+        try:
+            pcm = decoder(data)
+            if pcm:
+                return pcm
+            errors.append(f"{name}: no audio")
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise AudioDecodeError("Could not decode audio (" + "; ".join(errors) + ")")
+
+
+def _decode_wav(data):
+    """Parse a PCM WAV upload and convert it with NumPy"""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise AudioDecodeError(f"Unsupported WAV sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return _to_int16(_resample(samples, rate))
+
+
+def _resample(samples, rate):
+    """Linear-interpolation resample of float samples to SAMPLE_RATE"""
+    if rate == SAMPLE_RATE or len(samples) == 0:
+        return samples
+    target_length = int(round(len(samples) * SAMPLE_RATE / rate))
+    positions = np.linspace(0, len(samples) - 1, target_length)
+    return np.interp(positions, np.arange(len(samples)), samples)
+
+
+def _to_int16(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+def _decode_av(data):
+    """Decode any container/codec in-process with PyAV"""
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+    chunks = []
+    with av.open(io.BytesIO(data), mode='r') as container:
+        stream = next((s for s in container.streams if s.type == 'audio'), None)
+        if stream is None:
+            raise AudioDecodeError("No audio stream")
+        for frame in container.decode(stream):
+            frame.pts = None
+            for resampled in _as_list(resampler.resample(frame)):
+                chunks.append(bytes(resampled.planes[0])[:resampled.samples * SAMPLE_WIDTH])
+        # Flush samples buffered inside the resampler
+        for resampled in _as_list(resampler.resample(None)):
+            chunks.append(bytes(resampled.planes[0])[:resampled.samples * SAMPLE_WIDTH])
+    return b''.join(chunks)
+
+
+def _as_list(frames):
+    # Older PyAV returns a single frame (or None), newer returns a list
+    if frames is None:
+        return []
+    return frames if isinstance(frames, list) else [frames]
+
+
+def _decode_ffmpeg(data):
+    """Decode with an ffmpeg process reading stdin and writing raw PCM to stdout"""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-ar', str(SAMPLE_RATE),  # 16kHz sample rate
+        '-ac', str(CHANNELS),     # Mono
+        '-f', 's16le',            # raw 16-bit PCM
+        'pipe:1'
+    ]
+    result = subprocess.run(cmd, input=data, capture_output=True)
+    if result.returncode != 0:
+        raise AudioDecodeError(result.stderr.decode('utf-8', 'replace').strip())
+    return result.stdout
+
+
+def _decode_pydub(data):
+    """Last resort: pydub from a memory buffer"""
+    audio = AudioSegment.from_file(io.BytesIO(data))
+    audio = audio.set_frame_rate(SAMPLE_RATE).set_channels(CHANNELS).set_sample_width(SAMPLE_WIDTH)
+    return audio.raw_data
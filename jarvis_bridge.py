@@ -1,9 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from flask_cors import CORS
 import pyttsx3
 import os
 import sys
 import json
+import codecs
+import hmac
 import subprocess
 import threading
 import time
@@ -12,13 +14,16 @@ import webbrowser
 import sqlite3
 import requests
 import random
-try:
-    from pydub import AudioSegment
-    pydub_available = True
-    print("✅ PyDub for audio conversion available!")
-except ImportError:
-    pydub_available = False
-    print("⚠️ PyDub not available. Audio format conversion disabled.")
+import re
+from ai_client import AIBackendClient
+from response_cache import ResponseCache, make_key
+
+# Share the intent router with the Serenity desktop engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serinity', 'serenity'))
+from engine.intents import IntentRouter, rest_slot
+from engine.stt import createSTTService, STTError
+from engine.tts_cache import SpeechAudioCache, BackgroundRenderer, audioMimeType, playAudio
+from audio_pipeline import decode_to_pcm, SAMPLE_RATE, SAMPLE_WIDTH
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for web requests
@@ -38,15 +43,36 @@ def init_speech_engine():
         return None
 
 speech_engine = init_speech_engine()
+speech_lock = threading.Lock()  # pyttsx3 engines are not safe to drive from several request threads
 
-# Initialize speech recognition
-speech_recognition_available = False
-try:
-    import speech_recognition as sr
-    recognizer = sr.Recognizer()
-    speech_recognition_available = True
-    print("✅ Speech recognition initialized successfully!")
-except ImportError:
+# Synthesized phrases are kept on disk and replayed instead of re-synthesized;
+# they are rendered by a separate process, never on the request path
+tts_cache = SpeechAudioCache.fromEnv()
+tts_renderer = BackgroundRenderer(tts_cache)
+
+# Face recognizer (OpenCV, the trained model and serenity.db) is only loaded once face login is used,
+# or at startup with ENABLE_FACE_AUTH=True; it then stays resident
+face_auth_service = None
+face_auth_lock = threading.Lock()
+
+def get_face_auth_service():
+    global face_auth_service
+    with face_auth_lock:
+        if face_auth_service is None:
+            from engine.auth.face_service import getFaceAuthService
+            face_auth_service = getFaceAuthService()
+            face_auth_service.warmUp()
+        return face_auth_service
+
+if os.environ.get('ENABLE_FACE_AUTH', 'False').lower() == 'true':
+    threading.Thread(target=get_face_auth_service, daemon=True).start()
+
+# Initialize speech recognition (offline Vosk or Google, see STT_ENGINE)
+stt_service = createSTTService(language='en-US')
+speech_recognition_available = stt_service is not None
+if speech_recognition_available:
+    print(f"✅ Speech recognition initialized successfully! ({stt_service.name})")
+else:
     print("⚠️ Speech recognition not available. Install with: pip install SpeechRecognition")
 
 # AI Configuration
@@ -62,6 +88,12 @@ else:
     print("⚠️ No Hugging Face API key found. Set HUGGINGFACE_API_KEY environment variable to use Hugging Face API.")
     print("   You can get a free API key at: https://huggingface.co/settings/tokens")
 
+# Shared keep-alive client so chat turns reuse pooled connections to the inference API
+ai_client = AIBackendClient.from_env()
+
+# Cache of backend answers for repeated prompts (greetings, jokes, mood check-ins)
+response_cache = ResponseCache.from_env()
+
 # Initialize HugChat AI as fallback
 try:
     from hugchat import hugchat
@@ -81,83 +113,36 @@ try:
 except ImportError:
     print("⚠️ HugChat not installed. Install with: pip install hugchat")
 
-def convert_audio_to_wav(input_path, output_path):
-    """Convert audio file to WAV format using pydub and ffmpeg"""
-    try:
-        if not pydub_available:
-            print("⚠️ PyDub not available, skipping audio conversion")
-            # Try to copy the file as-is
-            import shutil
-            shutil.copy2(input_path, output_path)
-            return output_path
-        
-        print(f"🔄 Converting audio from {input_path} to {output_path}")
-        
-        # Try to detect and convert the audio format
-        try:
-            # Load audio with pydub (automatically detects format)
-            audio = AudioSegment.from_file(input_path)
-            print(f"📊 Audio info: {len(audio)}ms, {audio.frame_rate}Hz, {audio.channels} channels")
-            
-            # Convert to WAV format with speech recognition friendly settings
-            # 16kHz, 16-bit, mono is ideal for speech recognition
-            audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-            
-            # Export as WAV
-            audio.export(output_path, format="wav")
-            print(f"✅ Audio conversion successful: {output_path}")
-            
-            # Clean up original file
-            if os.path.exists(input_path):
-                os.remove(input_path)
-                print(f"🧹 Original file cleaned up: {input_path}")
-            
-            return output_path
-            
-        except Exception as conversion_error:
-            print(f"❌ PyDub conversion failed: {conversion_error}")
-            
-            # Fallback: Try using ffmpeg directly
-            try:
-                import subprocess
-                cmd = [
-                    'ffmpeg', '-i', input_path, 
-                    '-ar', '16000',  # 16kHz sample rate
-                    '-ac', '1',      # Mono
-                    '-sample_fmt', 's16',  # 16-bit
-                    '-y',            # Overwrite output
-                    output_path
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    print(f"✅ FFmpeg conversion successful: {output_path}")
-                    # Clean up original file
-                    if os.path.exists(input_path):
-                        os.remove(input_path)
-                    return output_path
-                else:
-                    print(f"❌ FFmpeg conversion failed: {result.stderr}")
-                    
-            except Exception as ffmpeg_error:
-                print(f"❌ FFmpeg fallback failed: {ffmpeg_error}")
-            
-            # Last resort: copy as-is and hope for the best
-            import shutil
-            shutil.copy2(input_path, output_path)
-            return output_path
-            
-    except Exception as e:
-        print(f"❌ Audio conversion error: {e}")
+# Simple text-to-speech function
+def speech_settings():
+    """(voice, rate) of the speech engine, part of the audio cache key"""
+    return speech_engine.getProperty('voice'), speech_engine.getProperty('rate')
+
+def synthesize_speech(text):
+    """Path to the audio for text, rendering it into the cache if needed"""
+    if not speech_engine or not tts_cache.cacheable(text):
         return None
+    voice, rate = speech_settings()
+    path = tts_cache.lookup(text, voice, rate)
+    if path:
+        return path
+    # the caller needs the file, so wait for the render process (the speech engine stays free)
+    return tts_renderer.submit(text, voice, rate).result(timeout=30)
 
-# Simple text-to-speech function
 def speak(text):
     """Convert text to speech"""
     try:
         if speech_engine:
-            speech_engine.say(text)
-            speech_engine.runAndWait()
+            if tts_cache.cacheable(text):
+                voice, rate = speech_settings()
+                path = tts_cache.lookup(text, voice, rate)
+                if path and playAudio(path):
+                    return True
+                if tts_cache.admit(text):
+                    tts_renderer.submit(text, voice, rate)
+            with speech_lock:
+                speech_engine.say(text)
+                speech_engine.runAndWait()
             return True
         else:
             print(f"Speech output: {text}")
@@ -167,31 +152,41 @@ def speak(text):
         return False
 
 # AI Chat function using multiple backends
-def get_huggingface_response(query):
-    """Get AI response from Hugging Face Inference API"""
+# Use a free model like Qwen2.5-Coder-32B-Instruct
+HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/Qwen/Qwen2.5-Coder-32B-Instruct"
+
+def build_huggingface_payload(query, stream=False):
+    """Build the Hugging Face text-generation payload for a query"""
+    # Create a mental health focused prompt
+    system_prompt = (
+        "You are Jarvis, a compassionate AI assistant specialized in mental health support and daily life assistance. "
+        "Provide helpful, empathetic, and concise responses. If the user seems distressed, offer emotional support and practical coping strategies. "
+        "Keep responses conversational and under 100 words unless more detail is specifically requested."
+    )
+    
+    payload = {
+        "inputs": f"{system_prompt}\n\nUser: {query}\nJarvis:",
+        "parameters": {
+            "max_new_tokens": 150,
+            "temperature": 0.7,
+            "do_sample": True,
+            "return_full_text": False
+        }
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+def get_huggingface_response(query, fallback=True):
+    """Get AI response from Hugging Face Inference API (None on failure if fallback is False)"""
     try:
-        # Use a free model like Qwen2.5-Coder-32B-Instruct
-        API_URL = "https://api-inference.huggingface.co/models/Qwen/Qwen2.5-Coder-32B-Instruct"
         headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
+        payload = build_huggingface_payload(query)
         
-        # Create a mental health focused prompt
-        system_prompt = (
-            "You are Jarvis, a compassionate AI assistant specialized in mental health support and daily life assistance. "
-            "Provide helpful, empathetic, and concise responses. If the user seems distressed, offer emotional support and practical coping strategies. "
-            "Keep responses conversational and under 100 words unless more detail is specifically requested."
-        )
-        
-        payload = {
-            "inputs": f"{system_prompt}\n\nUser: {query}\nJarvis:",
-            "parameters": {
-                "max_new_tokens": 150,
-                "temperature": 0.7,
-                "do_sample": True,
-                "return_full_text": False
-            }
-        }
-        
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+        response = ai_client.post(HUGGINGFACE_API_URL, headers=headers, json=payload)
+        timings = ai_client.last_timings
+        connect_info = 'reused connection' if timings['reused_connection'] else f"connect {timings['connect'] * 1000:.0f}ms"
+        print(f"⏱️ Hugging Face API: {connect_info}, TTFB {timings['ttfb'] * 1000:.0f}ms, total {timings['total'] * 1000:.0f}ms")
         
         if response.status_code == 200:
             result = response.json()
@@ -206,17 +201,17 @@ def get_huggingface_response(query):
         
         # If API response is empty or invalid, fall back
         print("⚠️ Hugging Face API returned empty response, using fallback")
-        return get_fallback_response(query)
+        return get_fallback_response(query) if fallback else None
         
     except requests.exceptions.Timeout:
         print("⚠️ Hugging Face API timeout, using fallback")
-        return get_fallback_response(query)
+        return get_fallback_response(query) if fallback else None
     except Exception as e:
         print(f"❌ Hugging Face API error: {e}")
-        return get_fallback_response(query)
+        return get_fallback_response(query) if fallback else None
 
-def get_hugchat_response(query):
-    """Get AI response from HugChat"""
+def get_hugchat_response(query, fallback=True):
+    """Get AI response from HugChat (None on failure if fallback is False)"""
     try:
         # Always append a request for short and concise answers
         enhanced_query = f"{query}\n\nPlease provide a short and concise answer."
@@ -225,24 +220,142 @@ def get_hugchat_response(query):
         return str(response)
     except Exception as e:
         print(f"❌ HugChat error: {e}")
-        return get_fallback_response(query)
+        return get_fallback_response(query) if fallback else None
 
-def get_ai_response(query):
-    """Get AI response using best available backend"""
+def stream_huggingface_response(query):
+    """Yield response tokens from the Hugging Face Inference API as they are generated"""
+    headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
+    payload = build_huggingface_payload(query, stream=True)
+    
+    response = ai_client.post(HUGGINGFACE_API_URL, headers=headers, json=payload, stream=True)
+    try:
+        response.raise_for_status()
+        stripper = ReplyPrefixStripper()
+        for line in response.iter_lines(decode_unicode=True):
+            text = stripper.feed(parse_huggingface_stream_line(line))
+            if text:
+                yield text
+        text = stripper.flush()
+        if text:
+            yield text
+    finally:
+        response.close()
+
+def parse_huggingface_stream_line(line):
+    """Return the token text carried by one Hugging Face streaming line ('' if none)"""
+    # Server-sent events: 'data: {"token": {"text": ...}, ...}'
+    if not line or not line.startswith('data:'):
+        return ''
+    token = json.loads(line[5:]).get('token') or {}
+    if token.get('special'):
+        return ''
+    return token.get('text', '')
+
+class ReplyPrefixStripper:
+    """Strip a leading 'Jarvis:' from a reply that arrives in chunks"""
+
+    def __init__(self, prefix='Jarvis:'):
+        self.prefix = prefix
+        self.pending = ''
+        self.started = False
+
+    def feed(self, text):
+        if self.started:
+            return text
+        # Hold back the start of the reply until the prefix can be stripped
+        self.pending += text
+        stripped = self.pending.lstrip()
+        if self.prefix.startswith(stripped):
+            return ''
+        self.started = True
+        if stripped.startswith(self.prefix):
+            stripped = stripped[len(self.prefix):].lstrip()
+        return stripped
+
+    def flush(self):
+        if self.started:
+            return ''
+        self.started = True
+        stripped = self.pending.strip()
+        return '' if self.prefix.startswith(stripped) else stripped
+
+def stream_hugchat_response(query):
+    """Yield response tokens from HugChat as they are generated"""
+    enhanced_query = f"{query}\n\nPlease provide a short and concise answer."
+    for chunk in chatbot.chat(enhanced_query, stream=True):
+        if isinstance(chunk, dict):
+            chunk = chunk.get('token') or ''
+        if chunk:
+            yield str(chunk)
+
+def build_prompt(query, feeling=None):
+    """Prepend the user's feeling to the query for the AI backends"""
+    if feeling:
+        return f"The user is feeling {feeling}. Please consider this when answering. {query}"
+    return query
+
+def get_ai_backend():
+    """Name of the best available AI backend, or None for fallback responses"""
     # Priority: 1. Hugging Face API, 2. HugChat, 3. Fallback
     if huggingface_available:
-        return get_huggingface_response(query)
+        return 'huggingface'
     elif hugchat_available:
-        return get_hugchat_response(query)
-    else:
-        return get_fallback_response(query)
+        return 'hugchat'
+    return None
+
+def get_cached_response(query, feeling, backend, use_cache=True):
+    """Look up a cached backend answer (None on a miss or when the cache is bypassed)"""
+    if not use_cache:
+        response_cache.record_bypass()
+        return None
+    cached = response_cache.get(make_key(query, feeling, backend))
+    if cached is not None:
+        print(f"⚡ Response cache hit ({backend})")
+    return cached
+
+def get_ai_response(query, feeling=None, use_cache=True):
+    """Get AI response using best available backend"""
+    prompt = build_prompt(query, feeling)
+
+    backend = get_ai_backend()
+    if backend is None:
+        # Canned responses are local and randomized, so they are never cached
+        return get_fallback_response(prompt)
+
+    cached = get_cached_response(query, feeling, backend, use_cache)
+    if cached is not None:
+        return cached
+
+    backend_response = get_huggingface_response if backend == 'huggingface' else get_hugchat_response
+    response = backend_response(prompt, fallback=False)
+    if response is None:
+        return get_fallback_response(prompt)
+    response_cache.put(make_key(query, feeling, backend), response)
+    return response
+
+# Topics recognised by the fallback responses, in priority order
+fallback_router = (
+    IntentRouter()
+    .add('anxiety', ['anxious', 'anxiety', 'worried', 'worry', 'stress', 'stressed', 'panic'])
+    .add('sadness', ['sad', 'depressed', 'down', 'lonely', 'empty'])
+    .add('happiness', ['happy', 'excited', 'great', 'amazing', 'wonderful'])
+    .add('joke', ['joke', 'jokes', 'funny'])
+    .add('identity', ['who are you', 'what are you', 'your name'])
+    .add('how_are_you', ['how are you'])
+    .add('gratitude', ['thank', 'thanks', 'thank you', 'appreciate'])
+    .add('goodbye', ['bye', 'goodbye', 'see you', 'later'])
+    .add('greeting', ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'])
+    .add('capabilities', ['what can you do', 'help'])
+    .add('motivation', ['motivation', 'motivate', 'inspire', 'inspiration', 'quote', 'quotes', 'wisdom'])
+    .add('weather', ['weather'])
+)
 
 def get_fallback_response(query):
     """Provide intelligent fallback responses when HugChat is not available"""
-    query_lower = query.lower().strip()
+    topic = fallback_router.intent(query)
     
     # Mental health and emotional support
-    if any(word in query_lower for word in ['anxious', 'anxiety', 'worried', 'stress', 'stressed', 'panic']):
+    if topic == 'anxiety':
         responses = [
             "I understand you're feeling anxious. Try taking slow, deep breaths. Remember, anxiety is temporary and you can get through this. Would you like some breathing exercises?",
             "Stress and anxiety are very common experiences. It's important to be gentle with yourself. Consider grounding techniques like naming 5 things you can see, 4 you can touch, 3 you can hear, 2 you can smell, and 1 you can taste.",
@@ -251,7 +364,7 @@ def get_fallback_response(query):
         import random
         return random.choice(responses)
     
-    elif any(word in query_lower for word in ['sad', 'depressed', 'down', 'lonely', 'empty']):
+    elif topic == 'sadness':
         responses = [
             "I'm sorry you're feeling this way. Your feelings are valid, and it's okay to not be okay sometimes. Consider reaching out to someone you trust or a mental health professional.",
             "Feeling down is part of the human experience. Remember that this feeling is temporary. Small acts of self-care like going for a walk, listening to music, or talking to a friend can help.",
@@ -260,7 +373,7 @@ def get_fallback_response(query):
         import random
         return random.choice(responses)
     
-    elif any(word in query_lower for word in ['happy', 'excited', 'great', 'amazing', 'wonderful']):
+    elif topic == 'happiness':
         responses = [
             "That's wonderful to hear! I'm so glad you're feeling positive. What's bringing you joy today?",
             "It's beautiful when we feel happy and excited. Savor these moments and remember them during tougher times.",
@@ -270,7 +383,7 @@ def get_fallback_response(query):
         return random.choice(responses)
     
     # Jokes and humor
-    elif "joke" in query_lower or "funny" in query_lower:
+    elif topic == 'joke':
         jokes = [
             "Why don't scientists trust atoms? Because they make up everything!",
             "Why did the scarecrow win an award? Because he was outstanding in his field!",
@@ -284,10 +397,10 @@ def get_fallback_response(query):
         return random.choice(jokes)
     
     # Personal questions
-    elif any(word in query_lower for word in ['who are you', 'what are you', 'your name']):
+    elif topic == 'identity':
         return "I'm Jarvis, your AI assistant and companion! I'm part of the Serenity AI system, designed to support your mental health and help with daily tasks. I can chat, tell jokes, open applications, play music, and provide emotional support."
     
-    elif "how are you" in query_lower:
+    elif topic == 'how_are_you':
         responses = [
             "I'm doing well, thank you for asking! I'm here and ready to help you with whatever you need.",
             "I'm functioning perfectly and feeling grateful to be able to assist you today!",
@@ -297,7 +410,7 @@ def get_fallback_response(query):
         return random.choice(responses)
     
     # Gratitude
-    elif any(word in query_lower for word in ['thank', 'thanks', 'appreciate']):
+    elif topic == 'gratitude':
         responses = [
             "You're very welcome! I'm always happy to help.",
             "No problem at all! That's what I'm here for.",
@@ -307,7 +420,7 @@ def get_fallback_response(query):
         return random.choice(responses)
     
     # Goodbye
-    elif any(word in query_lower for word in ['bye', 'goodbye', 'see you', 'later']):
+    elif topic == 'goodbye':
         responses = [
             "Goodbye! Take care of yourself and remember that you're doing great.",
             "See you later! Remember to be kind to yourself today.",
@@ -317,7 +430,7 @@ def get_fallback_response(query):
         return random.choice(responses)
     
     # Greetings
-    elif any(word in query_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']):
+    elif topic == 'greeting':
         current_hour = datetime.datetime.now().hour
         if current_hour < 12:
             greeting = "Good morning!"
@@ -335,11 +448,11 @@ def get_fallback_response(query):
         return random.choice(responses)
     
     # Questions about capabilities
-    elif "what can you do" in query_lower or "help" in query_lower:
+    elif topic == 'capabilities':
         return "I can help you with many things! I can:\n• Provide mental health support and emotional guidance\n• Open applications on your computer\n• Play music and videos on YouTube\n• Tell jokes and have conversations\n• Provide the current time and date\n• Offer breathing exercises and relaxation tips\n• Listen to your concerns and provide supportive responses\n\nWhat would you like help with today?"
     
     # Motivational and inspirational
-    elif any(word in query_lower for word in ['motivation', 'inspire', 'quote', 'wisdom']):
+    elif topic == 'motivation':
         quotes = [
             "'The only way to do great work is to love what you do.' - Steve Jobs",
             "'Believe you can and you're halfway there.' - Theodore Roosevelt",
@@ -352,7 +465,7 @@ def get_fallback_response(query):
         return random.choice(quotes)
     
     # Weather (placeholder)
-    elif "weather" in query_lower:
+    elif topic == 'weather':
         return "I don't have access to real-time weather data, but I recommend checking your weather app or asking Siri/Google Assistant for current conditions in your area!"
     
     # Default intelligent responses
@@ -369,25 +482,85 @@ def get_fallback_response(query):
         import random
         return random.choice(responses)
 
+def stream_ai_response(query, feeling=None, use_cache=True):
+    """Yield AI response chunks from the best available backend as they arrive"""
+    prompt = build_prompt(query, feeling)
+
+    backend = get_ai_backend()
+    if backend is None:
+        yield get_fallback_response(prompt)
+        return
+
+    cached = get_cached_response(query, feeling, backend, use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    backend_stream = stream_huggingface_response if backend == 'huggingface' else stream_hugchat_response
+    chunks = []
+    try:
+        for chunk in backend_stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"❌ {backend} streaming error: {e}")
+        if not chunks:
+            yield get_fallback_response(prompt)
+        return
+
+    response = ''.join(chunks).strip()
+    if response:
+        print(f"🤖 Streamed {backend} Response: {response}")
+        response_cache.put(make_key(query, feeling, backend), response)
+    else:
+        yield get_fallback_response(prompt)
+
+def extract_youtube_search(match):
+    """Slot extractor for YouTube commands: the text after play/search/find/show"""
+    search_term = match.query.lower()
+    found = re.search(r"\b(?:play|search|find|show)\b(.*)", search_term)
+    if found:
+        search_term = found.group(1)
+    # Remove common words
+    search_term = re.sub(r"\b(?:on\s+)?youtube\b", "", search_term)
+    return {'search_term': ' '.join(search_term.split())}
+
+# Command intents, in priority order
+command_router = (
+    IntentRouter()
+    .add('time', ['time'])
+    .add('date', ['date'])
+    .add('open_app', ['open'], anchored=True, extract=rest_slot('app_name'))
+    .add('youtube', ['youtube'], extract=extract_youtube_search)
+    .add('web_search', ['search for', 'google'], anchored=True, extract=rest_slot('search_term'))
+)
+
 # Simple command processing
-def process_command(query):
-    """Process user commands with basic functionality"""
-    query_lower = query.lower().strip()
+def process_command(query, feeling=None, use_cache=True, ai_handler=None):
+    """Process user commands with basic functionality
+
+    Queries that are not commands go to ai_handler (get_ai_response by default).
+    """
+    match = command_router.route(query)
+    intent = match.intent if match else None
+    # A bare "open" / "google" names nothing to act on: let the AI answer it instead
+    if intent in ('open_app', 'web_search') and not ''.join(match.slots.values()).strip():
+        intent = None
     
     try:
         # Time commands
-        if "time" in query_lower:
+        if intent == 'time':
             current_time = datetime.datetime.now().strftime("%I:%M %p")
             return f"The current time is {current_time}."
         
         # Date commands
-        elif "date" in query_lower:
+        elif intent == 'date':
             current_date = datetime.datetime.now().strftime("%B %d, %Y")
             return f"Today is {current_date}."
         
         # Open applications
-        elif query_lower.startswith("open "):
-            app_name = query_lower.replace("open ", "").strip()
+        elif intent == 'open_app':
+            app_name = match.slots['app_name'].lower()
             try:
                 # macOS applications
                 if app_name in ["notes", "note"]:
@@ -416,17 +589,8 @@ def process_command(query):
                 return f"Sorry, I couldn't open {app_name}. Error: {str(e)}"
         
         # YouTube commands
-        elif "youtube" in query_lower or "on youtube" in query_lower:
-            # Extract search term
-            search_terms = ["play", "search", "find", "show"]
-            search_term = query_lower
-            for term in search_terms:
-                if term in query_lower:
-                    search_term = query_lower.split(term)[-1].strip()
-                    break
-            
-            # Remove common words
-            search_term = search_term.replace("on youtube", "").replace("youtube", "").strip()
+        elif intent == 'youtube':
+            search_term = match.slots['search_term']
             
             if search_term:
                 try:
@@ -443,8 +607,8 @@ def process_command(query):
                 return "What would you like me to play on YouTube?"
         
         # Web search
-        elif query_lower.startswith("search for ") or query_lower.startswith("google "):
-            search_term = query_lower.replace("search for ", "").replace("google ", "").strip()
+        elif intent == 'web_search':
+            search_term = match.slots['search_term'].lower()
             if search_term:
                 search_url = f"https://www.google.com/search?q={search_term.replace(' ', '+')}"
                 webbrowser.open(search_url)
@@ -452,7 +616,7 @@ def process_command(query):
         
         # For all other queries, use HugChat AI if available
         else:
-            return get_ai_response(query)
+            return (ai_handler or get_ai_response)(query, feeling=feeling, use_cache=use_cache)
             
     except Exception as e:
         return f"I'm sorry, I encountered an error: {str(e)}"
@@ -464,16 +628,13 @@ def chat_endpoint():
         data = request.get_json()
         user_message = data.get('message', '').strip()
         feeling = data.get('feeling', '').strip() if data.get('feeling') else None
+        use_cache = not data.get('no_cache', False)
         
         if not user_message:
             return jsonify({'error': 'No message provided'}), 400
         
-        # If feeling is present, prepend it to the message for HugChat
-        if feeling:
-            user_message = f"The user is feeling {feeling}. Please consider this when answering. {user_message}"
-        
-        # Process the message
-        response = process_command(user_message)
+        # Process the message (the feeling is passed on to the AI backends)
+        response = process_command(user_message, feeling=feeling, use_cache=use_cache)
         
         return jsonify({
             'response': response,
@@ -484,14 +645,57 @@ def chat_endpoint():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def sse_event(data, event=None):
+    """Format one Server-Sent Event"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+def chat_stream_endpoint():
+    """Stream the chat response as Server-Sent Events while it is generated"""
+    data = request.get_json(silent=True) or request.args
+    user_message = (data.get('message') or '').strip()
+    feeling = (data.get('feeling') or '').strip() or None
+    use_cache = str(data.get('no_cache', '')).lower() not in ('true', '1')
+    
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    def generate():
+        chunks = []
+        try:
+            result = process_command(user_message, feeling=feeling, use_cache=use_cache, ai_handler=stream_ai_response)
+            # Commands answer with a plain string, AI replies with a generator of tokens
+            for chunk in ([result] if isinstance(result, str) else result):
+                chunks.append(chunk)
+                yield sse_event({'token': chunk})
+        except Exception as e:
+            yield sse_event({'error': str(e)}, event='error')
+            return
+        yield sse_event({
+            'response': ''.join(chunks),
+            'type': 'text',
+            'ai_mode': 'huggingface' if huggingface_available else ('hugchat' if hugchat_available else 'fallback')
+        }, event='done')
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/speak', methods=['POST'])
 def speak_text():
-    """Convert text to speech"""
+    """Convert text to speech (format=audio returns the synthesized audio instead)"""
     try:
         data = request.get_json()
         text = data.get('text', '')
         
-        if text:
+        if text and data.get('format') == 'audio':
+            path = synthesize_speech(text)
+            if not path:
+                return jsonify({'error': 'Speech synthesis not available'}), 501
+            return send_file(path, mimetype=audioMimeType(path))
+        elif text:
             success = speak(text)
             return jsonify({'status': 'success' if success else 'error'})
         else:
@@ -500,15 +704,19 @@ def speak_text():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/status', methods=['GET'])
-def status():
-    """Check if server is running"""
-    return jsonify({
+def get_status_info():
+    """Server status reported by /api/status"""
+    return {
         'status': 'running',
         'jarvis_connected': True,
         'hugchat_available': hugchat_available,
+        'ai_client': ai_client.stats(),
+        'response_cache': response_cache.stats(),
+        'tts_cache': dict(tts_cache.stats(), renderer=tts_renderer.stats()),
+        'face_auth': face_auth_service.stats() if face_auth_service else {'loaded': False},
         'features': [
             'text_chat',
+            'streaming_chat',
             'text_to_speech',
             'app_control',
             'youtube_control',
@@ -518,7 +726,12 @@ def status():
             'ai_conversations'
         ],
         'module_status': 'hugchat_enabled' if hugchat_available else 'fallback_mode'
-    })
+    }
+
+@app.route('/api/status', methods=['GET'])
+def status():
+    """Check if server is running"""
+    return jsonify(get_status_info())
 
 @app.route('/api/voice-input', methods=['POST'])
 def voice_input():
@@ -548,64 +761,18 @@ def voice_input():
                 'response': 'Please select an audio file for voice input.'
             }), 400
         
-        # Generate unique temporary filename to avoid conflicts
-        import uuid
-        temp_audio_path = f"temp_voice_input_{uuid.uuid4().hex[:8]}.wav"
-        
         try:
-            # Save the audio file temporarily
-            original_audio_path = f"temp_voice_original_{uuid.uuid4().hex[:8]}"
-            audio_file.save(original_audio_path)
-            print(f"🎤 Original audio file saved to: {original_audio_path}")
-            
-            # Convert audio to WAV format if needed
-            converted_path = convert_audio_to_wav(original_audio_path, temp_audio_path)
-            if not converted_path:
-                raise Exception("Audio conversion failed")
-            
-            print(f"🎤 Audio converted to WAV: {temp_audio_path}")
-            
-            # Adjust recognizer settings for better accuracy
-            recognizer.energy_threshold = 300
-            recognizer.dynamic_energy_threshold = True
-            recognizer.pause_threshold = 0.8
-            recognizer.operation_timeout = None
-            recognizer.phrase_threshold = 0.3
-            recognizer.non_speaking_duration = 0.8
-            
-            # Use speech recognition to convert audio to text
-            with sr.AudioFile(temp_audio_path) as source:
-                print("🎤 Processing audio file...")
-                # Adjust for ambient noise
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                # Record the audio
-                audio_data = recognizer.record(source)
-                print("🎤 Audio recorded, attempting recognition...")
-                
-                # Try multiple recognition services for better accuracy
-                text = None
-                recognition_service = 'unknown'
-                
-                # Primary: Google Speech Recognition
-                try:
-                    text = recognizer.recognize_google(audio_data, language='en-US')
-                    recognition_service = 'google'
-                    print(f"🎤 Google Recognition successful: {text}")
-                except (sr.UnknownValueError, sr.RequestError) as e:
-                    print(f"🎤 Google Recognition failed: {e}")
-                    
-                    # Fallback: Try with different language settings
-                    try:
-                        text = recognizer.recognize_google(audio_data, language='en')
-                        recognition_service = 'google_fallback'
-                        print(f"🎤 Google Recognition (fallback) successful: {text}")
-                    except (sr.UnknownValueError, sr.RequestError):
-                        print("🎤 All recognition methods failed")
+            # Decode the upload in memory straight to 16 kHz mono 16-bit PCM
+            pcm = decode_to_pcm(audio_file.read())
+            print(f"🎤 Audio decoded in memory: {len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH):.1f}s, attempting recognition...")
             
-            # Clean up temporary file
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-                print(f"🎤 Temporary file {temp_audio_path} cleaned up")
+            # One recognition pass on the resident engine
+            text = stt_service.transcribe(pcm, SAMPLE_RATE)
+            recognition_service = stt_service.name
+            if text:
+                print(f"🎤 {recognition_service} recognition successful: {text}")
+            else:
+                print(f"🎤 {recognition_service} recognition could not understand the audio")
             
             if text:
                 # Process the recognized text through our AI
@@ -636,27 +803,7 @@ def voice_input():
                     ]
                 }), 400
             
-        except sr.UnknownValueError:
-            # Clean up temporary file
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-            
-            return jsonify({
-                'error': 'Could not understand audio',
-                'text': '',
-                'response': 'I could not understand what you said. Please try again or type your message.',
-                'suggestions': [
-                    'Speak more clearly',
-                    'Reduce background noise',
-                    'Try again with better audio quality'
-                ]
-            }), 400
-            
-        except sr.RequestError as e:
-            # Clean up temporary file
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-            
+        except STTError as e:
             return jsonify({
                 'error': f'Speech recognition service error: {str(e)}',
                 'text': '',
@@ -668,12 +815,6 @@ def voice_input():
                 ]
             }), 500
             
-        except Exception as audio_error:
-            # Clean up temporary file
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-            raise audio_error
-            
     except Exception as e:
         print(f"🎤 Voice input error: {str(e)}")
         return jsonify({
@@ -683,14 +824,65 @@ def voice_input():
             'debug_info': str(e) if app.debug else None
         }), 500
 
+def authenticate_face_images(images):
+    """Run uploaded frames through the resident face recognizer; returns (payload, status code)"""
+    if not images:
+        return {'error': 'No image provided (upload one or more "image" files)'}, 400
+    try:
+        service = get_face_auth_service()
+    except ImportError as e:
+        return {'error': f'Face authentication not available: {e}', 'authenticated': False}, 503
+    from engine.auth.face_service import FaceAuthError
+    try:
+        result = service.authenticateImages(images)
+    except FaceAuthError as e:
+        return {'error': f'Face authentication not available: {e}', 'authenticated': False}, 503
+    result['status'] = 'success'
+    result['message'] = f"Welcome {result['name']}" if result['authenticated'] else 'Face not recognized'
+    return result, 200
+
 @app.route('/api/face-auth', methods=['POST'])
 def face_authentication():
-    """Handle face authentication (placeholder)"""
-    return jsonify({
-        'status': 'success',
-        'authenticated': True,
-        'message': 'Face authentication is not yet configured.'
-    })
+    """Authenticate uploaded camera frames against the trained face model"""
+    images = [f.read() for f in request.files.getlist('image')]
+    payload, status_code = authenticate_face_images(images)
+    return jsonify(payload), status_code
+
+def import_allowed(remote_addr, token):
+    """Imports write to serenity.db, so only a local client holding IMPORT_TOKEN may run them"""
+    expected = os.environ.get('IMPORT_TOKEN', '')
+    if not expected:
+        return False
+    return remote_addr in ('127.0.0.1', '::1', 'localhost') and hmac.compare_digest(token or '', expected)
+
+def import_records(kind, upload, filename=''):
+    """Stream an uploaded contacts (.vcf/.csv) or commands (.csv) file into serenity.db; returns (payload, status code)"""
+    if upload is None:
+        return {'error': 'No file provided (upload it as "file")'}, 400
+    from engine.importer import readContacts, readCommandsCSV, importContacts, importCommands
+    text = codecs.getreader('utf-8-sig')(upload, errors='replace')
+    try:
+        if kind == 'contacts':
+            stats = importContacts(readContacts(text, filename=filename))
+        elif kind == 'commands':
+            stats = importCommands(readCommandsCSV(text))
+        else:
+            return {'error': f'Unknown import kind: {kind}'}, 404
+    except (ValueError, LookupError) as e:
+        return {'error': str(e)}, 400
+    except sqlite3.Error as e:
+        return {'error': f'Database error: {e}'}, 500
+    return dict(stats, status='success', kind=kind), 200
+
+@app.route('/api/import/<kind>', methods=['POST'])
+def import_endpoint(kind):
+    """Bulk import a phonebook export (kind=contacts) or an app/website list (kind=commands); localhost only"""
+    if not import_allowed(request.remote_addr, request.headers.get('X-Import-Token')):
+        return jsonify({'error': 'Import is only available locally with IMPORT_TOKEN'}), 403
+    upload = request.files.get('file')
+    payload, status_code = import_records(kind, upload.stream if upload else None,
+                                          upload.filename if upload else '')
+    return jsonify(payload), status_code
 
 if __name__ == '__main__':
     print("🚀 Starting Enhanced Jarvis Bridge Server...")
@@ -715,9 +907,13 @@ if __name__ == '__main__':
     print("  - Time and date information")
     print("\n🌐 Available endpoints:")
     print("- POST /api/chat - Text-based chat")
+    print("- POST /api/chat/stream - Streaming chat (Server-Sent Events)")
     print("- POST /api/speak - Text-to-speech")
     print("- GET /api/status - Server status")
     print("- POST /api/voice-input - Voice input (placeholder)")
     print("- POST /api/face-auth - Face authentication (placeholder)")
+    print("- POST /api/import/contacts, /api/import/commands - Bulk import (localhost, needs IMPORT_TOKEN)")
+    
+    print("\n💡 For many concurrent users run the async server instead: python jarvis_bridge_async.py")
     
     app.run(host='0.0.0.0', port=8080, debug=True)
@@ -0,0 +1,449 @@
+"""
+Asyncio (ASGI) serving mode for the Jarvis bridge.
+
+Serves the same endpoints and JSON contracts as jarvis_bridge.py, but the AI
+backends are awaited on non-blocking HTTP clients, so a slow inference call no
+longer pins a worker thread. Speech recognition runs on the bridge's shared STT
+service off the event loop. Each backend has its own concurrency limit.
+
+Requires Python 3.9+. Run with:  python jarvis_bridge_async.py
+      or:  uvicorn jarvis_bridge_async:app --host 0.0.0.0 --port 8080
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import random
+import threading
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+import jarvis_bridge as bridge
+from ai_client import RETRY_STATUSES
+from audio_pipeline import decode_to_pcm, SAMPLE_RATE
+from engine.stt import STTError
+from engine.tts_cache import audioMimeType
+from response_cache import make_key
+
+# Per-backend concurrency limits
+BACKEND_LIMITS = {
+    'huggingface': int(os.environ.get('ASYNC_HUGGINGFACE_CONCURRENCY', 64)),
+    'hugchat': int(os.environ.get('ASYNC_HUGCHAT_CONCURRENCY', 4)),
+    'stt': int(os.environ.get('ASYNC_STT_CONCURRENCY', 16)),
+    'tts': 1,  # the speech engine can only say one thing at a time
+}
+backend_semaphores = {}
+
+http_client = None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Open one pooled async HTTP client for the lifetime of the server"""
+    global http_client
+    # Created here so they belong to the server's event loop
+    for name, limit in BACKEND_LIMITS.items():
+        backend_semaphores[name] = asyncio.Semaphore(limit)
+    client = bridge.ai_client
+    pool_size = int(os.environ.get('AI_POOL_SIZE', 10))
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max(pool_size, BACKEND_LIMITS['huggingface']),
+                            max_keepalive_connections=pool_size),
+        timeout=httpx.Timeout(client.read_timeout, connect=client.connect_timeout),
+    )
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+
+
+async def post_with_retries(url, **kwargs):
+    """POST with the same retry/backoff and total budget as the sync AIBackendClient"""
+    client = bridge.ai_client
+
+    async def attempts():
+        attempt = 0
+        while True:
+            try:
+                response = await http_client.post(url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt >= client.max_retries:
+                    return response
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt >= client.max_retries:
+                    raise
+            attempt += 1
+            await asyncio.sleep(client.backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+    return await asyncio.wait_for(attempts(), timeout=client.total_timeout)
+
+
+async def get_huggingface_response_async(prompt):
+    """Get AI response from Hugging Face Inference API (None on failure)"""
+    headers = {"Authorization": f"Bearer {bridge.HUGGINGFACE_API_KEY}"}
+    try:
+        async with backend_semaphores['huggingface']:
+            response = await post_with_retries(bridge.HUGGINGFACE_API_URL, headers=headers,
+                                               json=bridge.build_huggingface_payload(prompt))
+        if response.status_code == 200:
+            result = response.json()
+            if isinstance(result, list) and len(result) > 0:
+                ai_response = result[0].get('generated_text', '').strip()
+                if ai_response.startswith('Jarvis:'):
+                    ai_response = ai_response[7:].strip()
+                if ai_response:
+                    print(f"🤖 Hugging Face Response: {ai_response}")
+                    return ai_response
+        print("⚠️ Hugging Face API returned empty response, using fallback")
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        print("⚠️ Hugging Face API timeout, using fallback")
+    except Exception as e:
+        print(f"❌ Hugging Face API error: {e}")
+    return None
+
+
+async def stream_huggingface_response_async(prompt):
+    """Yield response tokens from the Hugging Face Inference API as they are generated"""
+    headers = {"Authorization": f"Bearer {bridge.HUGGINGFACE_API_KEY}"}
+    payload = bridge.build_huggingface_payload(prompt, stream=True)
+    async with backend_semaphores['huggingface']:
+        async with http_client.stream('POST', bridge.HUGGINGFACE_API_URL, headers=headers, json=payload) as response:
+            response.raise_for_status()
+            stripper = bridge.ReplyPrefixStripper()
+            async for line in response.aiter_lines():
+                text = stripper.feed(bridge.parse_huggingface_stream_line(line))
+                if text:
+                    yield text
+            text = stripper.flush()
+            if text:
+                yield text
+
+
+async def stream_hugchat_response_async(prompt):
+    """Yield HugChat tokens; the blocking HugChat client runs on a worker thread"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for chunk in bridge.stream_hugchat_response(prompt):
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    async with backend_semaphores['hugchat']:
+        threading.Thread(target=produce, daemon=True).start()
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+async def get_ai_response_async(query, feeling=None, use_cache=True):
+    """Async counterpart of bridge.get_ai_response"""
+    prompt = bridge.build_prompt(query, feeling)
+
+    backend = bridge.get_ai_backend()
+    if backend is None:
+        return bridge.get_fallback_response(prompt)
+
+    cached = bridge.get_cached_response(query, feeling, backend, use_cache)
+    if cached is not None:
+        return cached
+
+    if backend == 'huggingface':
+        response = await get_huggingface_response_async(prompt)
+    else:
+        async with backend_semaphores['hugchat']:
+            response = await asyncio.to_thread(bridge.get_hugchat_response, prompt, False)
+    if response is None:
+        return bridge.get_fallback_response(prompt)
+    bridge.response_cache.put(make_key(query, feeling, backend), response)
+    return response
+
+
+async def stream_ai_response_async(query, feeling=None, use_cache=True):
+    """Async counterpart of bridge.stream_ai_response"""
+    prompt = bridge.build_prompt(query, feeling)
+
+    backend = bridge.get_ai_backend()
+    if backend is None:
+        yield bridge.get_fallback_response(prompt)
+        return
+
+    cached = bridge.get_cached_response(query, feeling, backend, use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    backend_stream = stream_huggingface_response_async if backend == 'huggingface' else stream_hugchat_response_async
+    chunks = []
+    try:
+        async for chunk in backend_stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"❌ {backend} streaming error: {e}")
+        if not chunks:
+            yield bridge.get_fallback_response(prompt)
+        return
+
+    response = ''.join(chunks).strip()
+    if response:
+        bridge.response_cache.put(make_key(query, feeling, backend), response)
+    else:
+        yield bridge.get_fallback_response(prompt)
+
+
+async def process_command_async(query, feeling=None, use_cache=True, ai_handler=get_ai_response_async):
+    """Run bridge.process_command off the event loop, then await the AI reply if it is one"""
+    # The handler is an async function, so process_command hands back its coroutine
+    # (or async generator) unstarted and it is awaited here on the event loop
+    return await asyncio.to_thread(bridge.process_command, query, feeling, use_cache, ai_handler)
+
+
+async def transcribe_async(pcm):
+    """Recognize PCM audio on the shared STT service (same path as the Flask bridge) without blocking the loop"""
+    async with backend_semaphores['stt']:
+        return await asyncio.to_thread(bridge.stt_service.transcribe, pcm, SAMPLE_RATE)
+
+
+def ai_mode():
+    return bridge.get_ai_backend() or 'fallback'
+
+
+async def chat_endpoint(request):
+    """Handle text-based chat"""
+    try:
+        data = await request.json()
+        user_message = data.get('message', '').strip()
+        feeling = data.get('feeling', '').strip() if data.get('feeling') else None
+        use_cache = not data.get('no_cache', False)
+
+        if not user_message:
+            return JSONResponse({'error': 'No message provided'}, status_code=400)
+
+        response = await process_command_async(user_message, feeling, use_cache)
+        if asyncio.iscoroutine(response):
+            response = await response
+
+        return JSONResponse({
+            'response': response,
+            'type': 'text',
+            'ai_mode': 'hugchat' if bridge.hugchat_available else 'fallback'
+        })
+
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def chat_stream_endpoint(request):
+    """Stream the chat response as Server-Sent Events while it is generated"""
+    if request.method == 'POST':
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            data = {}
+    else:
+        data = request.query_params
+    user_message = (data.get('message') or '').strip()
+    feeling = (data.get('feeling') or '').strip() or None
+    use_cache = str(data.get('no_cache', '')).lower() not in ('true', '1')
+
+    if not user_message:
+        return JSONResponse({'error': 'No message provided'}, status_code=400)
+
+    async def generate():
+        chunks = []
+        try:
+            result = await process_command_async(user_message, feeling, use_cache, ai_handler=stream_ai_response_async)
+            if isinstance(result, str):
+                chunks.append(result)
+                yield bridge.sse_event({'token': result})
+            else:
+                async for chunk in result:
+                    chunks.append(chunk)
+                    yield bridge.sse_event({'token': chunk})
+        except Exception as e:
+            yield bridge.sse_event({'error': str(e)}, event='error')
+            return
+        yield bridge.sse_event({'response': ''.join(chunks), 'type': 'text', 'ai_mode': ai_mode()}, event='done')
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+async def speak_text(request):
+    """Convert text to speech (format=audio returns the synthesized audio instead)"""
+    try:
+        data = await request.json()
+        text = data.get('text', '')
+
+        if text and data.get('format') == 'audio':
+            async with backend_semaphores['tts']:
+                path = await asyncio.to_thread(bridge.synthesize_speech, text)
+            if not path:
+                return JSONResponse({'error': 'Speech synthesis not available'}, status_code=501)
+            return FileResponse(path, media_type=audioMimeType(path))
+        elif text:
+            async with backend_semaphores['tts']:
+                success = await asyncio.to_thread(bridge.speak, text)
+            return JSONResponse({'status': 'success' if success else 'error'})
+        else:
+            return JSONResponse({'error': 'No text provided'}, status_code=400)
+
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def status(request):
+    """Check if server is running"""
+    payload = bridge.get_status_info()
+    payload['server'] = 'asgi'
+    payload['backend_limits'] = BACKEND_LIMITS
+    return JSONResponse(payload)
+
+
+async def voice_input(request):
+    """Handle voice input using non-blocking speech recognition"""
+    try:
+        if not bridge.speech_recognition_available:
+            return JSONResponse({
+                'error': 'Speech recognition not available. Please install SpeechRecognition: pip install SpeechRecognition',
+                'text': '',
+                'response': 'Voice input requires SpeechRecognition library. Please type your message instead.'
+            }, status_code=501)
+
+        form = await request.form()
+        audio_file = form.get('audio')
+        if audio_file is None or isinstance(audio_file, str):
+            return JSONResponse({
+                'error': 'No audio file provided',
+                'text': '',
+                'response': 'Please provide an audio file for voice input.'
+            }, status_code=400)
+
+        if audio_file.filename == '':
+            return JSONResponse({
+                'error': 'No audio file selected',
+                'text': '',
+                'response': 'Please select an audio file for voice input.'
+            }, status_code=400)
+
+        # Decode the upload in memory straight to 16 kHz mono 16-bit PCM
+        pcm = await asyncio.to_thread(decode_to_pcm, await audio_file.read())
+
+        recognition_service = bridge.stt_service.name
+        try:
+            text = await transcribe_async(pcm)
+        except STTError as e:
+            print(f"🎤 {recognition_service} recognition failed: {e}")
+            return JSONResponse({
+                'error': f'Speech recognition service error: {str(e)}',
+                'text': '',
+                'response': 'Speech recognition service is currently unavailable. Please type your message.',
+                'suggestions': [
+                    'Check your internet connection',
+                    'Try again in a moment',
+                    'Use text input instead'
+                ]
+            }, status_code=500)
+
+        if not text:
+            return JSONResponse({
+                'error': 'Could not understand audio',
+                'text': '',
+                'response': 'I could not understand what you said. Please try speaking more clearly or type your message.',
+                'suggestions': [
+                    'Speak closer to the microphone',
+                    'Reduce background noise',
+                    'Speak more slowly and clearly',
+                    'Try typing your message instead'
+                ]
+            }, status_code=400)
+
+        response = await get_ai_response_async(text)
+
+        # Speak the response back without holding up the reply
+        if bridge.speech_engine:
+            async def speak_later():
+                async with backend_semaphores['tts']:
+                    await asyncio.to_thread(bridge.speak, response)
+            asyncio.create_task(speak_later())
+
+        return JSONResponse({
+            'text': text,
+            'response': response,
+            'type': 'voice',
+            'recognition_service': recognition_service,
+            'ai_mode': ai_mode()
+        })
+
+    except Exception as e:
+        print(f"🎤 Voice input error: {str(e)}")
+        return JSONResponse({
+            'error': f'Voice input error: {str(e)}',
+            'text': '',
+            'response': 'An error occurred while processing voice input. Please try typing your message.',
+            'debug_info': None
+        }, status_code=500)
+
+
+async def face_authentication(request):
+    """Authenticate uploaded camera frames against the trained face model"""
+    form = await request.form()
+    images = [await f.read() for f in form.getlist('image')]
+    payload, status_code = await asyncio.to_thread(bridge.authenticate_face_images, images)
+    return JSONResponse(payload, status_code=status_code)
+
+
+async def import_endpoint(request):
+    """Bulk import a phonebook export (kind=contacts) or an app/website list (kind=commands); localhost only"""
+    client = request.client.host if request.client else None
+    if not bridge.import_allowed(client, request.headers.get('x-import-token')):
+        return JSONResponse({'error': 'Import is only available locally with IMPORT_TOKEN'}, status_code=403)
+    try:
+        form = await request.form()
+        upload = form.get('file')
+        payload, status_code = await asyncio.to_thread(
+            bridge.import_records, request.path_params['kind'], upload.file if upload else None,
+            upload.filename if upload else '')
+    except Exception as e:
+        print(f"📇 Import error: {e}")
+        payload, status_code = {'error': f'Import failed: {e}'}, 500
+    return JSONResponse(payload, status_code=status_code)
+
+
+app = Starlette(
+    routes=[
+        Route('/api/chat', chat_endpoint, methods=['POST']),
+        Route('/api/chat/stream', chat_stream_endpoint, methods=['GET', 'POST']),
+        Route('/api/speak', speak_text, methods=['POST']),
+        Route('/api/status', status, methods=['GET']),
+        Route('/api/voice-input', voice_input, methods=['POST']),
+        Route('/api/face-auth', face_authentication, methods=['POST']),
+        Route('/api/import/{kind}', import_endpoint, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting Jarvis Bridge Server (async mode)...")
+    print(f"🎯 Primary AI Backend: {ai_mode()}")
+    print(f"⚙️ Backend concurrency limits: {BACKEND_LIMITS}")
+    uvicorn.run(app, host='0.0.0.0', port=8080)
@@ -0,0 +1,133 @@
+"""
+Response cache for the Jarvis bridge AI backends.
+
+Answers are keyed on the normalized query, the user's feeling and the backend
+that produced them. A bounded in-memory LRU with a TTL sits in front of an
+optional SQLite tier so cached answers survive a restart.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key"""
+    query = re.sub(r"[^\w\s']", ' ', query.lower())
+    return ' '.join(query.split())
+
+
+def make_key(query, feeling=None, backend=''):
+    """Cache key for a (query, feeling, backend) triple"""
+    raw = '\x1f'.join([backend or '', normalize_query(feeling or ''), normalize_query(query)])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU+TTL cache with an optional on-disk SQLite tier"""
+
+    def __init__(self, max_entries=256, ttl=3600, db_path=None, max_disk_entries=5000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()  # key -> (created, response)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0, 'evictions': 0}
+
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache(key TEXT PRIMARY KEY, response TEXT, created REAL)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_created ON response_cache(created)")
+                self._db.execute("DELETE FROM response_cache WHERE created < ?", (time.time() - self.ttl,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Response cache database unavailable, using memory only: {e}")
+                self._db = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RESPONSE_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 256)),
+            ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 3600)),
+            db_path=os.environ.get('RESPONSE_CACHE_DB') or None,
+        )
+
+    def get(self, key):
+        """Return a cached response or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created FROM response_cache WHERE key = ?", (key,)).fetchone()
+                if row and now - row[1] < self.ttl:
+                    self._remember(key, row[1], row[0])
+                    self._stats['disk_hits'] += 1
+                    return row[0]
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key, response):
+        """Store a response in memory and, if configured, on disk"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            self._stats['stores'] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO response_cache(key, response, created) VALUES (?, ?, ?)",
+                        (key, response, now))
+                    # Keep the disk tier bounded as well
+                    if self._stats['stores'] % 100 == 0:
+                        self._db.execute(
+                            "DELETE FROM response_cache WHERE created < ? OR key NOT IN "
+                            "(SELECT key FROM response_cache ORDER BY created DESC LIMIT ?)",
+                            (now - self.ttl, self.max_disk_entries))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Response cache write failed: {e}")
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def _remember(self, key, created, response):
+        self._entries[key] = (created, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters for /api/status"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 3) if lookups else None
+        stats['persistent'] = self._db is not None
+        return stats
@@ -0,0 +1,258 @@
+import os
+import queue
+import re
+import shlex
+import subprocess
+import threading
+import time
+
+
+class AdbError(Exception):
+    """The adb shell session could not be started or stopped answering"""
+
+
+class AdbSession:
+    """One long-lived `adb shell` process that scripts are written to
+
+    Starting adb for every tap costs a process spawn and a USB/TCP handshake;
+    here each script is written to the same shell and its end is found by an
+    echoed marker carrying the exit status. If the shell had already exited
+    before a script was sent, the script is sent once more on a new shell.
+    A shell that dies after receiving the script is restarted on the next
+    call instead, and AdbError is raised: `input tap` prints nothing, so the
+    script may have run and sending it again could tap twice.
+    """
+
+    def __init__(self, adb=None, serial=None, timeout=10.0):
+        adb = adb or os.environ.get('ADB_PATH', 'adb')
+        # ADB_PATH may carry arguments, e.g. "python engine/fake_adb.py"
+        self.command = shlex.split(adb, posix=os.name != 'nt') + (['-s', serial] if serial else []) + ['shell']
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._process = None
+        self._output = None
+        self._sequence = 0
+        self._sent = False
+        self.scripts = 0
+        self.commands = 0
+        self.restarts = 0
+
+    def _start(self):
+        try:
+            self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.STDOUT)
+        except OSError as e:
+            raise AdbError(f"Cannot start {self.command[0]}: {e}")
+        self._output = queue.Queue()
+        threading.Thread(target=self._read, args=(self._process, self._output), daemon=True).start()
+
+    @staticmethod
+    def _read(process, output):
+        for line in iter(process.stdout.readline, b''):
+            output.put(line.decode('utf-8', 'replace').rstrip('\r\n'))
+        output.put(None)  # the shell exited
+
+    def run(self, *commands, timeout=None):
+        """Run shell commands as one script; returns (exit status of the last one, output)"""
+        with self._lock:
+            for attempt in range(2):
+                if self._process is None or self._process.poll() is not None:
+                    if self._process is not None or attempt:
+                        self.restarts += 1
+                    self._start()
+                try:
+                    return self._runScript(commands, timeout or self.timeout)
+                except (EOFError, OSError) as e:
+                    sent = self._sent
+                    self._stop()
+                    if attempt or sent:
+                        raise AdbError(f"adb shell failed: {e}")
+                    # the shell was gone before the script reached it, nothing ran: send it again
+                except AdbError:
+                    self._stop()
+                    raise
+
+    def _runScript(self, commands, timeout):
+        self._sequence += 1
+        marker = f"__serenity_done_{self._sequence}__"
+        script = '\n'.join(commands) + f"\necho {marker} $?\n"
+        self._sent = False
+        # the reader queues None when the shell exits; seen before writing, the script was never sent
+        while True:
+            try:
+                line = self._output.get_nowait()
+            except queue.Empty:
+                break
+            if line is None:
+                raise EOFError("shell exited (device disconnected?)")
+        # an OSError here (closed pipe) also means the shell did not read any of it
+        self._process.stdin.write(script.encode('utf-8'))
+        self._process.stdin.flush()
+        self._sent = True
+        self.scripts += 1
+        self.commands += len(commands)
+
+        lines = []
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._output.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise AdbError(f"no answer within {timeout}s")
+            if line is None:
+                raise EOFError("shell exited (device disconnected?)")
+            # startswith: shells with a pty echo the script back, including the echo command itself
+            if line.startswith(marker):
+                status = line[len(marker):].strip()
+                return (int(status) if status.isdigit() else 0), '\n'.join(lines)
+            lines.append(line)
+
+    def _stop(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def stats(self):
+        return {'scripts': self.scripts, 'commands': self.commands, 'restarts': self.restarts,
+                'connected': self._process is not None and self._process.poll() is None}
+
+
+class AndroidDevice:
+    """Input events and state checks on the phone, sent through one AdbSession
+
+    Each action is a single script (six back presses are one round trip), and
+    instead of sleeping a fixed second after every event, callers wait for the
+    state they need: a window in focus, the keyboard shown, a text on screen.
+    The last uiautomator dump is kept until the next input event, so looking
+    up an element that a check just saw does not dump the screen again.
+    """
+
+    def __init__(self, session=None, poll_interval=0.1):
+        self.session = session or AdbSession()
+        self.poll_interval = poll_interval
+        self._home = None
+        self._nodes = None  # last dump, None once an input event may have changed the screen
+        self.dumps = 0
+
+    def shell(self, *commands, timeout=None):
+        return self.session.run(*commands, timeout=timeout)[1]
+
+    def _input(self, *commands):
+        self._nodes = None
+        self.session.run(*commands)
+
+    def keyEvents(self, *key_codes):
+        self._input(*(f"input keyevent {int(code)}" for code in key_codes))
+
+    def tap(self, x, y):
+        self._input(f"input tap {int(x)} {int(y)}")
+
+    def text(self, message):
+        # input text ends the word at a space, %s is its escape for one
+        self._input(f"input text {shlex.quote(str(message).replace(' ', '%s'))}")
+
+    def startActivity(self, *args):
+        self._input("am start " + ' '.join(shlex.quote(str(arg)) for arg in args))
+
+    def focusedWindow(self):
+        """'package/activity' of the window that has input focus ('' if unknown)"""
+        output = self.shell("dumpsys window | grep -E 'mCurrentFocus|mFocusedWindow'")
+        match = re.search(r'\s([\w.]+/[\w.$]+)\}', output)
+        return match.group(1) if match else ''
+
+    def homePackage(self):
+        if self._home is None:
+            output = self.shell("cmd package resolve-activity --brief -a android.intent.action.MAIN "
+                                "-c android.intent.category.HOME | tail -n 1")
+            self._home = output.strip().split('/')[0]
+        return self._home
+
+    def keyboardShown(self):
+        return 'mInputShown=true' in self.shell("dumpsys input_method | grep mInputShown")
+
+    @property
+    def dumpCached(self):
+        """True while the last dump still shows the screen as far as input events go"""
+        return self._nodes is not None
+
+    def uiNodes(self, cached=False):
+        """Attributes of every node in the current UI hierarchy (uiautomator dump)
+
+        cached=True reuses the last dump if no input event was sent since.
+        """
+        if cached and self._nodes is not None:
+            return self._nodes
+        output = self.shell("uiautomator dump /sdcard/serenity_ui.xml >/dev/null && cat /sdcard/serenity_ui.xml")
+        self.dumps += 1
+        self._nodes = [dict(re.findall(r'([\w-]+)="([^"]*)"', node)) for node in re.findall(r'<node\b([^>]*)>', output)]
+        return self._nodes
+
+    def screenText(self, cached=False):
+        """Every text and content description in the current UI hierarchy"""
+        return [value for node in self.uiNodes(cached) for value in (node.get('text'), node.get('content-desc'))
+                if value]
+
+    def findElement(self, text=None, description=None, resource_id=None, cached=False):
+        """Centre (x, y) of the first node whose text / content description contains the given ones, or None"""
+        for node in self.uiNodes(cached):
+            if text and text.lower() not in node.get('text', '').lower():
+                continue
+            if description and description.lower() not in node.get('content-desc', '').lower():
+                continue
+            if resource_id and not node.get('resource-id', '').endswith(resource_id):
+                continue
+            bounds = [int(n) for n in re.findall(r'-?\d+', node.get('bounds', ''))]
+            if len(bounds) == 4:
+                return (bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2
+        return None
+
+    def waitUntil(self, condition, timeout=5.0):
+        """Poll condition() until it is true; returns False after timeout so the caller can carry on"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if condition():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def waitForFocus(self, package, timeout=5.0):
+        return self.waitUntil(lambda: self.focusedWindow().startswith(package + '/'), timeout)
+
+    def waitForFocusChange(self, previous, timeout=5.0):
+        return self.waitUntil(lambda: self.focusedWindow() not in ('', previous), timeout)
+
+    def waitForHome(self, timeout=5.0):
+        home = self.homePackage()
+        if not home:
+            return False
+        return self.waitForFocus(home, timeout)
+
+    def waitForKeyboard(self, timeout=3.0):
+        return self.waitUntil(self.keyboardShown, timeout)
+
+    def waitForText(self, text, timeout=5.0):
+        text = text.lower()
+        return self.waitUntil(lambda: any(text in t.lower() for t in self.screenText()), timeout)
+
+
+_device = None
+_device_lock = threading.Lock()
+
+
+def getAndroidDevice():
+    global _device
+    with _device_lock:
+        if _device is None:
+            _device = AndroidDevice(AdbSession(serial=os.environ.get('ADB_SERIAL') or None))
+        return _device
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(AUTH_DIR)))  # so engine.* imports work when run as a script
+
+from engine.auth.dataset import normalizeFace
+from engine.auth.face_service import FaceAuthService, MODEL_PATH
+from engine.auth.histogram_index import HistogramIndex
+from engine.auth.identities import Identity, IdentityRegistry
+from engine.config import DB_PATH
+from engine.auth.pipeline import FaceAuthPipeline, StageTimer
+from engine.database import Database
+
+SAMPLES_DIR = os.path.join(AUTH_DIR, 'samples')
+RESULTS_DIR = os.path.join(AUTH_DIR, 'benchmarks')
+
+
+class FakeVideoCapture:
+    """Stands in for cv2.VideoCapture by serving preloaded frames, optionally paced to a frame rate"""
+
+    def __init__(self, frames, fps=None, width=640, height=480):
+        self.frames = frames
+        self.fps = fps
+        self.position = 0
+        self.props = {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height}
+        self._next_frame_at = None
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        self.props[prop] = value
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+    def read(self):
+        if self.position >= len(self.frames):
+            return False, None
+        if self.fps:
+            # Block like a real sensor delivering frames at a fixed rate
+            now = time.perf_counter()
+            if self._next_frame_at is None:
+                self._next_frame_at = now
+            if self._next_frame_at > now:
+                time.sleep(self._next_frame_at - now)
+            self._next_frame_at += 1.0 / self.fps
+        frame = self.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def loadSamples(samples):
+    """Grayscale face crops from samples/, grouped by user id in sample order"""
+    groups = defaultdict(list)
+    for f in sorted(os.listdir(samples), key=lambda f: [int(p) if p.isdigit() else p for p in f.split('.')]):
+        if not f.startswith('face.'):
+            continue
+        crop = cv2.imread(os.path.join(samples, f), cv2.IMREAD_GRAYSCALE)
+        if crop is not None:
+            groups[int(f.split('.')[1])].append(crop)
+    return groups
+
+
+def splitSamples(groups, holdout=0.2):
+    """(train, test) crops per user: every n-th sample is held out of training"""
+    every = max(2, round(1 / holdout))
+    train, test = {}, {}
+    for label, crops in groups.items():
+        train[label] = [crop for i, crop in enumerate(crops) if i % every != every - 1]
+        test[label] = crops[every - 1::every]
+    return train, test
+
+
+def trainModel(groups, directory):
+    """Train a throwaway LBPH model and histogram index on the given crops; returns the model path"""
+    faces, ids = [], []
+    index = HistogramIndex()
+    for label, crops in groups.items():
+        crops = np.array([normalizeFace(crop) for crop in crops])
+        if not len(crops):
+            continue
+        faces.extend(crops)
+        ids.extend([label] * len(crops))
+        index.add(label, crops, crops)
+    if not faces:
+        sys.exit("Not enough samples to train on, lower --holdout")
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(faces, np.array(ids))
+    model_path = os.path.join(directory, 'trainer.yml')
+    recognizer.write(model_path)
+    index.save(os.path.join(directory, 'histograms.npz'))
+    return model_path
+
+
+def sampleFrame(crop, width=640, height=480):
+    """A face crop placed on a camera-sized BGR frame"""
+    # Keep the face at most 60% of the frame height, like someone in front of the kiosk
+    scale = min(1.0, 0.6 * height / crop.shape[0], 0.6 * width / crop.shape[1])
+    if scale < 1.0:
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    frame = np.full((height, width), 127, dtype=np.uint8)
+    h, w = crop.shape
+    y, x = (height - h) // 2, (width - w) // 2
+    frame[y:y+h, x:x+w] = crop
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+
+def clipFrames(path, width=640, height=480):
+    """Every frame of a recorded clip, resized to the camera resolution"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def parseClip(spec):
+    """'path[:label]' -> (path, label); the label defaults to the id in clip.<id>.*, 0 means impostor"""
+    path, _, label = spec.rpartition(':')
+    if not path or not label.isdigit():
+        path, label = spec, None
+    if label is None:
+        parts = os.path.basename(path).split('.')
+        label = parts[1] if len(parts) > 2 and parts[1].isdigit() else 0
+    return path, int(label)
+
+
+def enrolledUsers(path=DB_PATH):
+    """Identities saved in serenity.db, read without running migrations or writing to it"""
+    if not os.path.exists(path):
+        return []
+    try:
+        con = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            rows = con.execute("SELECT label, name, threshold, enabled FROM face_users").fetchall()
+        finally:
+            con.close()
+    except sqlite3.Error as e:  # e.g. no face_users table yet
+        print(f"⚠️ Cannot read enrolled users from {path}: {e}")
+        return []
+    return [Identity(label, name, threshold, bool(enabled)) for label, name, threshold, enabled in rows]
+
+
+def expectedName(service, label):
+    identity = service.registry.get(label)
+    return identity.name if identity and identity.enabled else None
+
+
+def measureFrames(service, sequences, options):
+    """Run every frame through detect+predict: throughput, stage latency, false accept/reject"""
+    timer = StageTimer(keep=10 ** 6)
+    counts = defaultdict(int)
+    elapsed = 0.0
+    for source, label, frames in sequences:
+        expected = expectedName(service, label)
+        pipeline = FaceAuthPipeline(service, FakeVideoCapture(frames), show=False, **options)
+        pipeline.timer = timer
+        started = time.perf_counter()
+        for img in frames:
+            box, name, _ = pipeline.processFrame(img)
+            if expected is None:
+                counts['impostor'] += 1
+                counts['false_accept'] += name is not None
+            else:
+                counts['genuine'] += 1
+                counts['no_face'] += box is None
+                counts['false_reject'] += name is None
+                counts['misidentified'] += name is not None and name != expected
+        elapsed += time.perf_counter() - started
+
+    frames = counts['genuine'] + counts['impostor']
+    return {
+        'frames': frames,
+        'fps': round(frames / elapsed, 1) if elapsed else 0.0,
+        'stages': timer.summary(),
+        'counts': dict(counts),
+        'false_reject_rate': _rate(counts['false_reject'], counts['genuine']),
+        'false_accept_rate': _rate(counts['false_accept'], counts['impostor']),  # None without impostors
+        'misidentification_rate': _rate(counts['misidentified'], counts['genuine']),
+        'no_face_rate': _rate(counts['no_face'], counts['genuine']),
+    }
+
+
+def measureLogins(service, sequences, options, fps, timeout):
+    """Replay each sequence through the threaded login pipeline from a paced fake camera"""
+    logins = []
+    for source, label, frames in sequences:
+        expected = expectedName(service, label)
+        pipeline = FaceAuthPipeline(service, FakeVideoCapture(frames, fps=fps), show=False, **options)
+        pipeline.run(timeout)
+        stats = pipeline.stats()
+        logins.append({
+            'source': source,
+            'label': label,
+            'expected': expected,
+            'name': pipeline.name,
+            'correct': pipeline.name == expected,
+            'false_accept': pipeline.name is not None and pipeline.name != expected,
+            'false_reject': expected is not None and pipeline.name is None,
+            'time_to_authenticate_s': stats['elapsed_s'] if pipeline.name else None,
+            'fps': stats['fps'],
+            'frames_processed': stats['frames_processed'],
+            'frames_dropped': stats['frames_dropped'],
+            'stages': stats['stages'],
+        })
+
+    genuine = [l for l in logins if l['expected'] is not None]
+    impostors = [l for l in logins if l['expected'] is None]
+    times = sorted(l['time_to_authenticate_s'] for l in genuine if l['correct'])
+    return {
+        'logins': logins,
+        'false_reject_rate': _rate(sum(l['false_reject'] for l in genuine), len(genuine)),
+        'false_accept_rate': _rate(sum(l['false_accept'] for l in impostors), len(impostors)),
+        'misidentification_rate': _rate(sum(l['false_accept'] for l in genuine), len(genuine)),
+        'time_to_authenticate_s': _percentiles(times),
+    }
+
+
+def _rate(part, total):
+    return round(part / total, 4) if total else None
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'p50': round(values[len(values) // 2], 3),
+        'p90': round(values[min(len(values) - 1, int(len(values) * 0.9))], 3),
+        'max': round(values[-1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face authentication without a camera")
+    parser.add_argument('--samples', default=SAMPLES_DIR, help="directory of face.<id>.<n>.jpg samples ('' to skip)")
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help="share of the samples replayed; a throwaway model is trained on the rest")
+    parser.add_argument('--clip', action='append', default=[], metavar='PATH[:ID]',
+                        help="recorded video clip and the user id it shows (0 = impostor); repeatable")
+    parser.add_argument('--model', default=MODEL_PATH, help="model for the clips when no samples are replayed")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--scale-factor', type=float, default=1.2, help="Haar detectMultiScale scaleFactor")
+    parser.add_argument('--min-neighbors', type=int, default=5, help="Haar detectMultiScale minNeighbors")
+    parser.add_argument('--reject-margin', type=float, default=1.5, help="histogram index rejection margin")
+    parser.add_argument('--threshold', type=float, default=None, help="override every user's LBPH threshold")
+    parser.add_argument('--detect-width', type=int, default=320)
+    parser.add_argument('--redetect-every', type=int, default=10)
+    parser.add_argument('--required-matches', type=int, default=3)
+    parser.add_argument('--fps', type=float, default=30, help="fake camera frame rate for the login runs")
+    parser.add_argument('--timeout', type=float, default=10, help="give up a login after this many seconds")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/face_auth-<time>.json)")
+    args = parser.parse_args()
+
+    if not 0 < args.holdout < 1:
+        sys.exit("--holdout must be between 0 and 1")
+
+    # Work on a throwaway copy of the registry (thresholds, seeding), serenity.db is left untouched
+    registry = IdentityRegistry(Database(':memory:'))
+    for identity in enrolledUsers():
+        registry.add(identity.label, identity.name, threshold=identity.threshold if args.threshold is None else args.threshold)
+        registry.update(identity.label, enabled=identity.enabled)
+
+    sequences = []
+    model_path = args.model
+    workdir = None
+    if args.samples:
+        # The installed model was trained on every sample, replaying them would only measure recall of
+        # the training set: train on part of them and replay the faces the model has never seen
+        train, test = splitSamples(loadSamples(args.samples), args.holdout)
+        workdir = tempfile.mkdtemp(prefix='serenity-benchmark-')
+        model_path = trainModel(train, workdir)
+        for label, crops in test.items():
+            if crops:
+                sequences.append((f"samples:{label}", label, [sampleFrame(c, args.width, args.height) for c in crops]))
+    for spec in args.clip:
+        path, label = parseClip(spec)
+        sequences.append((path, label, clipFrames(path, args.width, args.height)))
+    if not sequences:
+        sys.exit("Nothing to replay: no samples and no --clip given")
+
+    service = FaceAuthService(model_path=model_path, registry=registry, reject_margin=args.reject_margin,
+                              scale_factor=args.scale_factor, min_neighbors=args.min_neighbors)
+    loaded = service.load()
+    if workdir:
+        shutil.rmtree(workdir, ignore_errors=True)  # the model is in memory now
+    if not loaded:
+        sys.exit(f"Cannot benchmark: {service.error}")
+    if not any(expectedName(service, label) is None for _, label, _ in sequences):
+        print("⚠️ No impostor clips given (--clip PATH:0), the false accept rate is not measured")
+
+    options = {'required_matches': args.required_matches, 'redetect_every': args.redetect_every,
+               'detect_width': args.detect_width}
+    print(f"Replaying {sum(len(s[2]) for s in sequences)} frames from {len(sequences)} sequences ...")
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': dict(vars(args), samples=args.samples or None),
+        'users': [identity._asdict() for identity in service.registry.all()],
+        'per_frame': measureFrames(service, sequences, options),
+        'login': measureLogins(service, sequences, options, args.fps, args.timeout),
+    }
+    results['rejected_by_index'] = service.rejected
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('face_auth-%Y%m%d-%H%M%S.json'))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    frame = results['per_frame']
+    login = results['login']
+    print(f"Per frame: {frame['fps']} fps, FRR {frame['false_reject_rate']}, FAR {frame['false_accept_rate']}")
+    for stage, s in frame['stages'].items():
+        print(f"  {stage:<10} p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms  p99 {s['p99_ms']:.2f}ms")
+    print(f"Logins: FRR {login['false_reject_rate']}, FAR {login['false_accept_rate']}, "
+          f"time to authenticate {login['time_to_authenticate_s']}")
+    print(f"Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(AUTH_DIR, 'dataset')
+FACE_SIZE = 200  # every crop is stored as FACE_SIZE x FACE_SIZE uint8
+
+
+def normalizeFace(gray_face):
+    """Resize a grayscale face crop to the stored FACE_SIZE x FACE_SIZE"""
+    if gray_face.shape[:2] == (FACE_SIZE, FACE_SIZE):
+        return np.ascontiguousarray(gray_face, dtype=np.uint8)
+    return cv2.resize(gray_face, (FACE_SIZE, FACE_SIZE), interpolation=cv2.INTER_AREA)
+
+
+class FaceDataset:
+    """Enrolled face crops, one fixed-size uint8 array file per user
+
+    user_<id>.u8 holds the user's crops back to back (FACE_SIZE x FACE_SIZE
+    each) and is read with np.memmap, so training needs no image decoding and
+    no second detection pass. index.json keeps the sample count and metadata.
+    """
+
+    def __init__(self, directory=DATASET_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.index = self._readIndex()
+
+    def _readIndex(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'face_size': FACE_SIZE, 'users': {}}
+
+    def _writeIndex(self):
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(temp_path, self.index_path)
+
+    def _file(self, user_id):
+        return os.path.join(self.directory, f"user_{int(user_id)}.u8")
+
+    def users(self):
+        """Enrolled user ids"""
+        return sorted(int(user_id) for user_id in self.index['users'])
+
+    def info(self, user_id):
+        return self.index['users'].get(str(int(user_id)))
+
+    def count(self, user_id):
+        info = self.info(user_id)
+        return info['count'] if info else 0
+
+    def append(self, user_id, faces, **metadata):
+        """Store grayscale face crops for a user; returns the user's new sample count"""
+        records = [normalizeFace(face) for face in faces]
+        with self._lock:
+            key = str(int(user_id))
+            info = self.index['users'].setdefault(key, {'count': 0, 'created': time.time()})
+            if records:
+                with open(self._file(user_id), 'ab') as f:
+                    for record in records:
+                        f.write(record.tobytes())
+            info['count'] += len(records)
+            info['updated'] = time.time()
+            info.update(metadata)
+            self._writeIndex()
+            return info['count']
+
+    def remove(self, user_id):
+        """Delete a user's samples (re-enrolment starts from an empty file)"""
+        with self._lock:
+            self.index['users'].pop(str(int(user_id)), None)
+            if os.path.exists(self._file(user_id)):
+                os.remove(self._file(user_id))
+            self._writeIndex()
+
+    def load(self, user_id, start=0):
+        """Read-only (count, FACE_SIZE, FACE_SIZE) memmap of a user's samples from start on"""
+        count = self.count(user_id)
+        if count <= start:
+            return np.empty((0, FACE_SIZE, FACE_SIZE), dtype=np.uint8)
+        samples = np.memmap(self._file(user_id), dtype=np.uint8, mode='r', shape=(count, FACE_SIZE, FACE_SIZE))
+        return samples[start:]
+
+    def size(self):
+        return sum(info['count'] for info in self.index['users'].values()) * FACE_SIZE * FACE_SIZE
@@ -0,0 +1,212 @@
+import os
+import threading
+
+from engine.auth.identities import IdentityRegistry
+
+try:
+    import cv2
+    import numpy as np
+    from engine.auth.dataset import normalizeFace
+    from engine.auth.histogram_index import HistogramIndex
+    from engine.auth.pipeline import FaceAuthPipeline
+    cv2_available = True
+except ImportError:
+    cv2_available = False
+
+
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(AUTH_DIR, 'trainer', 'trainer.yml')
+CASCADE_PATH = os.path.join(AUTH_DIR, 'haarcascade_frontalface_default.xml')
+
+
+class FaceAuthError(Exception):
+    """The face recognizer could not be loaded or the frame was unusable"""
+
+
+class FaceAuthService:
+    """LBPH recognizer and Haar cascade loaded once and kept in memory
+
+    The model and detector are shared by every authentication request, so a
+    login only pays for detection and prediction, not for parsing trainer.yml
+    and the cascade XML again.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, cascade_path=CASCADE_PATH, registry=None, reject_margin=1.5,
+                 scale_factor=1.2, min_neighbors=5):
+        self.model_path = model_path
+        self.cascade_path = cascade_path
+        self.registry = registry  # label -> user and per-user threshold, see identities.py
+        self.reject_margin = reject_margin
+        self.scale_factor = scale_factor  # Haar cascade detectMultiScale parameters
+        self.min_neighbors = min_neighbors
+        self.recognizer = None
+        self.detector = None
+        self.index = None  # per-user histogram centroids for fast rejection
+        self.rejected = 0
+        self.error = None
+        self.last_run = None  # stats of the last camera login
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+
+    def load(self):
+        """Load the model and cascade (only the first call does any work)"""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return self.error is None
+            try:
+                if not cv2_available:
+                    raise FaceAuthError("opencv-contrib-python is not installed")
+                if not os.path.exists(self.model_path):
+                    raise FaceAuthError(f"Face model not found at {self.model_path}, run trainer.py first")
+                recognizer = cv2.face.LBPHFaceRecognizer_create()  # Local Binary Patterns Histograms
+                recognizer.read(self.model_path)
+                detector = cv2.CascadeClassifier(self.cascade_path)
+                if detector.empty():
+                    raise FaceAuthError(f"Could not load Haar cascade from {self.cascade_path}")
+                self.recognizer = recognizer
+                self.detector = detector
+                if self.registry is None:
+                    self.registry = IdentityRegistry()
+                if not len(self.registry) and hasattr(recognizer, 'getLabels'):
+                    # trainer.yml from before face_users: register the users it was trained on
+                    seeded = self.registry.seed(np.asarray(recognizer.getLabels()).ravel().tolist())
+                    if seeded:
+                        print(f"✅ Registered {seeded} face user(s) from the existing model")
+                self.index = HistogramIndex.load(
+                    os.path.join(os.path.dirname(self.model_path), 'histograms.npz'), self.reject_margin)
+                print("✅ Face recognition model loaded")
+            except Exception as e:
+                self.error = str(e)
+                print(f"⚠️ Face recognition not available: {e}")
+            finally:
+                self._loaded.set()
+            return self.error is None
+
+    def reload(self):
+        """Drop the loaded model so the next request reads the retrained one"""
+        with self._load_lock:
+            self._loaded.clear()
+            self.error = None
+            if self.registry is not None:
+                self.registry.reload()
+        return self.load()
+
+    def warmUp(self):
+        """Load in the background so the first login does not wait for it"""
+        threading.Thread(target=self.load, daemon=True).start()
+
+    @property
+    def available(self):
+        return self.load()
+
+    def detect(self, gray, min_size=(30, 30)):
+        """Face rectangles (x, y, w, h) in a grayscale image"""
+        return self.detector.detectMultiScale(gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=min_size)
+
+    def predict(self, face):
+        """(name, confidence %) for a grayscale face crop; name is None if unknown"""
+        face = normalizeFace(face)  # same size as the enrolled samples
+        if self.index is not None and not self.index.candidates(face):
+            # Not close to any enrolled user: skip the full LBPH comparison
+            self.rejected += 1
+            return None, 0
+        with self._predict_lock:
+            id, distance = self.recognizer.predict(face)
+        confidence = round(100 - distance)
+        identity = self.registry.match(id, distance)
+        return (identity.name if identity else None), confidence
+
+    def authenticateFrame(self, img, min_size=None):
+        """Recognize the faces in one BGR or grayscale frame"""
+        if not self.load():
+            raise FaceAuthError(self.error)
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if min_size is None:
+            # Define min window size to be recognized as a face
+            min_size = (int(0.1 * gray.shape[1]), int(0.1 * gray.shape[0]))
+
+        faces = []
+        for (x, y, w, h) in self.detect(gray, min_size):
+            name, confidence = self.predict(gray[y:y+h, x:x+w])
+            faces.append({'box': [int(x), int(y), int(w), int(h)], 'name': name, 'confidence': confidence})
+        match = max((f for f in faces if f['name']), key=lambda f: f['confidence'], default=None)
+        return {
+            'authenticated': match is not None,
+            'name': match['name'] if match else None,
+            'confidence': match['confidence'] if match else None,
+            'faces': faces,
+        }
+
+    def authenticateImage(self, data):
+        """Recognize the faces in an encoded image (JPEG/PNG bytes)"""
+        if not self.load():
+            raise FaceAuthError(self.error)
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise FaceAuthError("Could not decode image")
+        return self.authenticateFrame(img)
+
+    def authenticateImages(self, images):
+        """Try uploaded frames in order and stop at the first authenticated one"""
+        result = {'authenticated': False, 'name': None, 'confidence': None, 'faces': []}
+        for count, data in enumerate(images, 1):
+            result = self.authenticateImage(data)
+            result['frames'] = count
+            if result['authenticated']:
+                break
+        return result
+
+    def authenticateCamera(self, camera=0, show=True, required_matches=3, redetect_every=10,
+                           detect_width=320, timeout=None):
+        """Recognize from the webcam until a known face is seen (1) or ESC is pressed (0)
+
+        Capture, inference and display run as separate stages (see
+        FaceAuthPipeline); show=False skips the preview window for headless runs.
+        The face is detected on a downscaled frame and tracked in between, and
+        login succeeds once required_matches consecutive predictions agree.
+        """
+        if not self.load():
+            print(f"Face authentication failed: {self.error}")
+            return 0
+
+        cam = cv2.VideoCapture(camera, cv2.CAP_DSHOW)  # cv2.CAP_DSHOW to remove warning
+        cam.set(3, 640)  # set video FrameWidht
+        cam.set(4, 480)  # set video FrameHeight
+        pipeline = FaceAuthPipeline(self, cam, show=show, required_matches=required_matches,
+                                    redetect_every=redetect_every, detect_width=detect_width)
+        try:
+            flag = pipeline.run(timeout)
+        finally:
+            # Do a bit of cleanup
+            cam.release()
+        pipeline.report()
+        self.last_run = pipeline.stats()
+        return flag
+
+    def stats(self):
+        return {
+            'loaded': self._loaded.is_set() and self.error is None,
+            'error': self.error,
+            'names': self.registry.names() if self.registry else [],
+            'indexed_users': len(self.index) if self.index is not None else 0,
+            'rejected': self.rejected,
+            'last_run': self.last_run,
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def getFaceAuthService():
+    """Process-wide FaceAuthService (FACE_REJECT_MARGIN widens or narrows the fast-rejection radius)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = FaceAuthService(
+                model_path=os.environ.get('FACE_MODEL_PATH', MODEL_PATH),
+                reject_margin=float(os.environ.get('FACE_REJECT_MARGIN', 1.5)),
+            )
+        return _service
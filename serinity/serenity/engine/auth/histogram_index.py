@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(AUTH_DIR, 'trainer', 'histograms.npz')
+GRID = 4  # cells per side; coarser than LBPH's 8x8 since this only has to rule faces out
+BINS = 256
+
+
+def lbpHistograms(faces):
+    """Spatial LBP histograms for a batch of equal-size grayscale faces (N x H x W -> N x GRID*GRID*BINS)"""
+    faces = np.asarray(faces)
+    if faces.ndim == 2:
+        faces = faces[np.newaxis]
+    faces = faces.astype(np.int16)
+    center = faces[:, 1:-1, 1:-1]
+    height, width = center.shape[1:]
+    codes = np.zeros(center.shape, dtype=np.int32)
+    # 3x3 neighbours clockwise from the top-left, one bit each
+    neighbours = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+    for bit, (dy, dx) in enumerate(neighbours):
+        codes |= (faces[:, dy:dy + height, dx:dx + width] >= center).astype(np.int32) << bit
+
+    cell_rows = np.minimum(np.arange(height) * GRID // height, GRID - 1)
+    cell_cols = np.minimum(np.arange(width) * GRID // width, GRID - 1)
+    cells = (cell_rows[:, np.newaxis] * GRID + cell_cols[np.newaxis, :]) * BINS
+    offsets = np.arange(len(faces))[:, np.newaxis, np.newaxis] * GRID * GRID * BINS
+    flat = (codes + cells + offsets).ravel()
+    hist = np.bincount(flat, minlength=len(faces) * GRID * GRID * BINS).astype(np.float32)
+    # Normalize per cell so the histogram does not depend on the face size
+    return hist.reshape(len(faces), GRID * GRID * BINS) / (height * width / (GRID * GRID))
+
+
+def _batchedHistograms(faces, batch=64):
+    # bounded memory for users with many samples
+    return np.concatenate([lbpHistograms(faces[i:i + batch]) for i in range(0, len(faces), batch)])
+
+
+def chiSquare(histograms, query):
+    """Chi-square distance of query to every row of histograms"""
+    diff = histograms - query
+    return (diff * diff / (histograms + query + 1e-6)).sum(axis=-1)
+
+
+class HistogramIndex:
+    """Per-user mean LBP histogram and spread, for rejecting unknown faces early
+
+    Checking a face against every user's centroid is one vectorized distance
+    computation, far cheaper than the LBPH prediction that compares it with
+    every enrolled sample. Faces that are not close to any centroid are
+    rejected without running the prediction at all.
+    """
+
+    def __init__(self, labels=(), sums=None, counts=(), radii=(), margin=1.5):
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.sums = sums if sums is not None else np.zeros((0, GRID * GRID * BINS), dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.radii = np.asarray(radii, dtype=np.float32)
+        self.margin = margin
+        self._refresh()
+
+    def _refresh(self):
+        counts = np.maximum(self.counts, 1)[:, np.newaxis]
+        self.centroids = (self.sums / counts).astype(np.float32)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, margin=1.5):
+        """The saved index, or None if the model was trained without one"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(data['labels'], data['sums'], data['counts'], data['radii'], margin)
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, labels=self.labels, sums=self.sums, counts=self.counts, radii=self.radii)
+
+    def add(self, label, faces, all_faces):
+        """Add new samples of a user; all_faces (every stored sample of the user) sets its spread"""
+        hist = _batchedHistograms(faces)
+        row = np.flatnonzero(self.labels == label)
+        if row.size:
+            row = row[0]
+            self.sums[row] += hist.sum(axis=0)
+            self.counts[row] += len(hist)
+        else:
+            row = len(self.labels)
+            self.labels = np.append(self.labels, label).astype(np.int32)
+            self.sums = np.vstack([self.sums, hist.sum(axis=0)])
+            self.counts = np.append(self.counts, len(hist))
+            self.radii = np.append(self.radii, 0).astype(np.float32)
+        self._refresh()
+        # Spread: 95th percentile distance of the user's own samples to their centroid
+        distances = chiSquare(_batchedHistograms(all_faces), self.centroids[row])
+        self.radii[row] = np.percentile(distances, 95)
+
+    def remove(self, label):
+        keep = self.labels != label
+        self.labels, self.sums = self.labels[keep], self.sums[keep]
+        self.counts, self.radii = self.counts[keep], self.radii[keep]
+        self._refresh()
+
+    def candidates(self, face):
+        """Labels whose centroid the face is close enough to, nearest first (empty = unknown face)"""
+        if not len(self.labels):
+            return []
+        distances = chiSquare(self.centroids, lbpHistograms(face)[0])
+        close = np.flatnonzero(distances <= self.radii * self.margin)
+        return [int(self.labels[i]) for i in close[np.argsort(distances[close])]]
+
+    def __len__(self):
+        return len(self.labels)
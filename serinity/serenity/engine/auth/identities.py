@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import namedtuple
+
+from engine.database import getDatabase
+
+DEFAULT_THRESHOLD = 100  # LBPH distance, lower is stricter ("0" is perfect match)
+
+Identity = namedtuple('Identity', 'label name threshold enabled')
+
+# The users recoganize.py knew before face_users existed (its hard-coded names list)
+LEGACY_NAMES = {1: 'Digambar'}
+
+
+def defaultName(label):
+    return LEGACY_NAMES.get(int(label)) or f"User {label}"
+
+
+class IdentityRegistry:
+    """Enrolled users (LBPH label -> name, threshold) stored in serenity.db
+
+    The whole table is kept in a dict, so resolving a predicted label during
+    login is a lookup and never touches the database.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or getDatabase()  # face_users comes from the migrations in database.py
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        with self._lock:
+            rows = self.db.query("SELECT label, name, threshold, enabled FROM face_users")
+            self._identities = {row[0]: Identity(row[0], row[1], row[2], bool(row[3])) for row in rows}
+
+    def get(self, label):
+        return self._identities.get(label)
+
+    def __contains__(self, label):
+        return label in self._identities
+
+    def __len__(self):
+        return len(self._identities)
+
+    def all(self):
+        return sorted(self._identities.values())
+
+    def names(self):
+        return [identity.name for identity in self.all() if identity.enabled]
+
+    def add(self, label, name, threshold=DEFAULT_THRESHOLD):
+        """Register (or rename) a user under an LBPH label"""
+        self.db.execute(
+            "INSERT INTO face_users (label, name, threshold, enabled, created_at) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(label) DO UPDATE SET name = excluded.name",
+            (int(label), name, threshold, time.time()))
+        self.reload()
+        return self.get(int(label))
+
+    def seed(self, labels):
+        """Register the labels of a model trained before face_users existed; only fills an empty table"""
+        with self._lock:
+            if self._identities:
+                return 0
+            labels = sorted({int(label) for label in labels})
+            with self.db.transaction() as con:
+                con.executemany(
+                    "INSERT OR IGNORE INTO face_users (label, name, threshold, enabled, created_at) "
+                    "VALUES (?, ?, ?, 1, ?)",
+                    [(label, defaultName(label), DEFAULT_THRESHOLD, time.time()) for label in labels])
+        self.reload()
+        return len(labels)
+
+    def update(self, label, threshold=None, enabled=None):
+        """Change a user's threshold or enable/disable their login"""
+        with self.db.transaction() as con:
+            if threshold is not None:
+                con.execute("UPDATE face_users SET threshold = ? WHERE label = ?", (threshold, int(label)))
+            if enabled is not None:
+                con.execute("UPDATE face_users SET enabled = ? WHERE label = ?", (int(enabled), int(label)))
+        self.reload()
+        return self.get(int(label))
+
+    def remove(self, label):
+        self.db.execute("DELETE FROM face_users WHERE label = ?", (int(label),))
+        self.reload()
+
+    def match(self, label, distance):
+        """The enabled identity for a prediction within that user's threshold, or None
+
+        With nobody registered (an install that only has trainer.yml) the old
+        behaviour applies: the legacy labels are accepted under the default threshold.
+        """
+        identities = self._identities
+        if not identities and label in LEGACY_NAMES:
+            identities = {label: Identity(label, LEGACY_NAMES[label], DEFAULT_THRESHOLD, True)}
+        identity = identities.get(label)
+        if identity is None or not identity.enabled or distance >= identity.threshold:
+            return None
+        return identity
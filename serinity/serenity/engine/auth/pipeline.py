@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from engine.auth.tracking import FaceTracker, MatchVoter
+
+
+class LatestFrameBuffer:
+    """Small ring buffer where the newest frame wins
+
+    The consumer always gets the most recent frame; older ones still waiting
+    are dropped, so a slow stage never works through a backlog of stale frames.
+    """
+
+    def __init__(self, size=2):
+        self._frames = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Newest item (discarding older ones), or None on timeout"""
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(timeout)
+            if not self._frames:
+                return None
+            item = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            return item
+
+
+class StageTimer:
+    """Keeps recent durations per pipeline stage"""
+
+    def __init__(self, keep=1000):
+        self.keep = keep
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._stages.setdefault(stage, deque(maxlen=self.keep)).append(seconds)
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+        with self._lock:
+            stages = {name: sorted(times) for name, times in self._stages.items()}
+        report = {}
+        for name, times in stages.items():
+            if not times:
+                continue
+            report[name] = {
+                'count': len(times),
+                'mean_ms': round(sum(times) / len(times) * 1000, 2),
+                'p50_ms': round(times[len(times) // 2] * 1000, 2),
+                'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 2),
+                'p99_ms': round(times[min(len(times) - 1, int(len(times) * 0.99))] * 1000, 2),
+                'max_ms': round(times[-1] * 1000, 2),
+            }
+        return report
+
+
+class FaceAuthPipeline:
+    """Camera login split into capture, inference and display stages
+
+    A capture thread keeps reading the camera into a latest-wins buffer, so
+    cam.read() blocking on the sensor no longer adds to recognition time. An
+    inference worker tracks and predicts on the newest frame, and the display
+    stage (skipped when show is False, e.g. headless kiosks) runs on the calling
+    thread because HighGUI windows belong to it.
+    """
+
+    def __init__(self, service, cam, show=True, required_matches=3, redetect_every=10,
+                 detect_width=320, buffer_size=2):
+        self.service = service
+        self.cam = cam
+        self.show = show
+        self.tracker = FaceTracker(service.detect, detect_width=detect_width, redetect_every=redetect_every)
+        self.votes = MatchVoter(required_matches)
+        self.timer = StageTimer()
+        self.frames = LatestFrameBuffer(buffer_size)
+        self.display = LatestFrameBuffer(1)
+        self.name = None
+        self.captured = 0
+        self.processed = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._eof = threading.Event()  # camera stopped delivering frames
+
+    def run(self, timeout=None):
+        """Authenticate until a match (1), ESC, end of stream or timeout (0)"""
+        started = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._capture, name='face-capture', daemon=True),
+            threading.Thread(target=self._infer, name='face-inference', daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            if self.show:
+                self._display(started, timeout)
+            else:
+                self._stop.wait(timeout)
+        finally:
+            self._stop.set()
+            for worker in workers:
+                worker.join(timeout=1)
+            if self.show:
+                cv2.destroyAllWindows()
+            self.elapsed = time.perf_counter() - started
+        return 1 if self.name else 0
+
+    def stop(self):
+        self._stop.set()
+
+    def _capture(self):
+        while not self._stop.is_set():
+            t = time.perf_counter()
+            ret, img = self.cam.read()  # read the frames using the above created object
+            self.timer.add('capture', time.perf_counter() - t)
+            if not ret:
+                self._eof.set()
+                break
+            self.captured += 1
+            self.frames.put(img)
+
+    def _infer(self):
+        while not self._stop.is_set():
+            img = self.frames.get(timeout=0.1)
+            if img is None:
+                if self._eof.is_set():
+                    self._stop.set()
+                continue
+            box, name, confidence = self.processFrame(img)
+            if box is None:
+                self.votes.reset()
+            elif self.votes.add(name):
+                self.name = name
+                self._stop.set()
+                break
+            if self.show:
+                self.display.put((img, box, name, confidence))
+
+    def processFrame(self, img):
+        """Track and predict on one BGR frame; returns (box, name, confidence)"""
+        t = time.perf_counter()
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        t_convert = time.perf_counter()
+        box = self.tracker.update(gray)
+        t_detect = time.perf_counter()
+        self.timer.add('convert', t_convert - t)
+        self.timer.add('detect', t_detect - t_convert)
+
+        name = confidence = None
+        if box is not None:
+            x, y, w, h = box
+            name, confidence = self.service.predict(gray[y:y+h, x:x+w])
+            self.timer.add('predict', time.perf_counter() - t_detect)
+        self.timer.add('inference', time.perf_counter() - t)
+        self.processed += 1
+        return box, name, confidence
+
+    def _display(self, started, timeout):
+        font = cv2.FONT_HERSHEY_SIMPLEX  # denotes the font type
+        while not self._stop.is_set():
+            if timeout is not None and time.perf_counter() - started > timeout:
+                break
+            item = self.display.get(timeout=0.05)
+            if item is None:
+                continue
+            t = time.perf_counter()
+            img, box, name, confidence = item
+            if box is not None:
+                x, y, w, h = box
+                # used to draw a rectangle on any image
+                cv2.rectangle(img, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                cv2.putText(img, str(name or 'unknown'), (x+5, y-5), font, 1, (255, 255, 255), 2)
+                cv2.putText(img, "  {0}%".format(confidence), (x+5, y+h-5), font, 1, (255, 255, 0), 1)
+            cv2.imshow('camera', img)
+            k = cv2.waitKey(1) & 0xff  # Press 'ESC' for exiting video
+            self.timer.add('display', time.perf_counter() - t)
+            if k == 27:
+                break
+
+    def stats(self):
+        return {
+            'authenticated': self.name is not None,
+            'name': self.name,
+            'elapsed_s': round(self.elapsed, 3),
+            'frames_captured': self.captured,
+            'frames_processed': self.processed,
+            'frames_dropped': self.frames.dropped,
+            'fps': round(self.processed / self.elapsed, 1) if self.elapsed else 0.0,
+            'tracker': self.tracker.stats(),
+            'stages': self.timer.summary(),
+        }
+
+    def report(self):
+        stages = self.timer.summary()
+        parts = ', '.join(f"{name} {s['mean_ms']:.1f}ms (p95 {s['p95_ms']:.1f})" for name, s in stages.items())
+        print(f"⏱️ Face auth {self.processed} frames in {self.elapsed:.2f}s: {parts}")
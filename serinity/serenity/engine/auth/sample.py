@@ -1,18 +1,34 @@
+import os
+import sys
+
 import cv2
 
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(AUTH_DIR)))  # so engine.* imports work when run as a script
+
+from engine.auth.dataset import FaceDataset
+from engine.auth.identities import IdentityRegistry, defaultName
+
 cam = cv2.VideoCapture(0, cv2.CAP_DSHOW) #create a video capture object which is helpful to capture videos through webcam
 cam.set(3, 640) # set video FrameWidth
 cam.set(4, 480) # set video FrameHeight
 
 
-detector = cv2.CascadeClassifier('engine\\auth\\haarcascade_frontalface_default.xml')
+detector = cv2.CascadeClassifier(os.path.join(AUTH_DIR, 'haarcascade_frontalface_default.xml'))
 #Haar Cascade classifier is an effective object detection approach
 
+dataset = FaceDataset() # one memory-mappable array file per user, see dataset.py
+
 face_id = input("Enter a Numeric user ID  here:  ")
 #Use integer ID for every new face (0,1,2,3,4,5,6,7,8,9........)
+name = input("Enter the name for this user:  ").strip() or defaultName(face_id)
+
+if dataset.count(face_id) and input("This ID already has samples, replace them? (y/n)  ").lower() == 'y':
+    dataset.remove(face_id)
 
 print("Taking samples, look at camera ....... ")
 count = 0 # Initializing sampling face count
+crops = []
 
 while True:
 
@@ -25,9 +41,8 @@ while True:
         cv2.rectangle(img, (x,y), (x+w,y+h), (255,0,0), 2) #used to draw a rectangle on any image
         count += 1
 
-        
-        cv2.imwrite("engine\\auth\\samples\\face." + str(face_id) + '.' + str(count) + ".jpg", converted_image[y:y+h,x:x+w])
-        # To capture & Save images into the datasets folder
+        crops.append(converted_image[y:y+h,x:x+w].copy())
+        # Collected here and written to the dataset in one append
 
         cv2.imshow('image', img) #Used to display an image in a window
 
@@ -37,6 +52,8 @@ while True:
     elif count >= 100: # Take 50 sample (More sample --> More accuracy)
          break
 
-print("Samples taken now closing the program....")
+total = dataset.append(face_id, crops, name=name)
+IdentityRegistry().add(face_id, name) # label -> name used at login, see identities.py
+print(f"{len(crops)} samples taken ({total} stored for user {face_id}), now closing the program....")
 cam.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
@@ -0,0 +1,99 @@
+import cv2
+
+
+class FaceTracker:
+    """Follows one face between frames instead of detecting on every frame
+
+    Full detection runs on a downscaled copy of the frame. In between, the face
+    is followed by template matching in a small window around its last position,
+    and detection only runs again every redetect_every frames or when the match
+    score drops (tracking lost).
+    """
+
+    def __init__(self, detect, detect_width=320, redetect_every=10, min_score=0.6, margin=0.5):
+        self.detect = detect  # detect(gray, min_size) -> [(x, y, w, h), ...]
+        self.detect_width = detect_width
+        self.redetect_every = redetect_every
+        self.min_score = min_score
+        self.margin = margin
+        self.detections = 0
+        self.tracked = 0
+        self.reset()
+
+    def reset(self):
+        self.box = None
+        self.template = None
+        self.frames_since_detect = 0
+
+    def update(self, gray):
+        """Box (x, y, w, h) of the face in this grayscale frame, or None"""
+        if self.box is not None and self.frames_since_detect < self.redetect_every:
+            box = self._track(gray)
+            if box is not None:
+                return box
+        return self._detect(gray)
+
+    def _detect(self, gray):
+        self.detections += 1
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.detect_width / float(width))
+        small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Define min window size to be recognized as a face
+        min_size = (int(0.1 * small.shape[1]), int(0.1 * small.shape[0]))
+        faces = self.detect(small, min_size)
+        if len(faces) == 0:
+            self.reset()
+            return None
+        # Follow the largest (closest) face
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        x, y, w, h = int(x / scale), int(y / scale), int(w / scale), int(h / scale)
+        w, h = min(w, width - x), min(h, height - y)
+        return self._keep(gray, (x, y, w, h), detected=True)
+
+    def _track(self, gray):
+        x, y, w, h = self.box
+        height, width = gray.shape[:2]
+        mx, my = int(w * self.margin), int(h * self.margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(width, x + w + mx), min(height, y + h + my)
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] < h or window.shape[1] < w:
+            return None
+
+        result = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (tx, ty) = cv2.minMaxLoc(result)
+        if score < self.min_score:
+            return None
+        self.tracked += 1
+        return self._keep(gray, (x0 + tx, y0 + ty, w, h), detected=False)
+
+    def _keep(self, gray, box, detected):
+        x, y, w, h = box
+        self.box = box
+        self.template = gray[y:y+h, x:x+w].copy()
+        self.frames_since_detect = 0 if detected else self.frames_since_detect + 1
+        return box
+
+    def stats(self):
+        return {'detections': self.detections, 'tracked': self.tracked}
+
+
+class MatchVoter:
+    """Accepts an identity once `required` consecutive predictions agree on it"""
+
+    def __init__(self, required=3):
+        self.required = required
+        self.reset()
+
+    def reset(self):
+        self.name = None
+        self.count = 0
+
+    def add(self, name):
+        """Record one prediction (None = unknown); returns the name once agreed"""
+        if name is None or name != self.name:
+            self.name = name
+            self.count = 0 if name is None else 1
+        else:
+            self.count += 1
+        return self.name if self.name is not None and self.count >= self.required else None
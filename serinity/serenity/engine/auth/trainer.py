@@ -1,40 +1,135 @@
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import numpy as np
 from PIL import Image #pillow package
-import os
 
-path = 'engine\\auth\\samples' # Path for samples already taken
+AUTH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(AUTH_DIR)))  # so engine.* imports work when run as a script
 
-recognizer = cv2.face.LBPHFaceRecognizer_create() # Local Binary Patterns Histograms
-detector = cv2.CascadeClassifier("engine\\auth\\haarcascade_frontalface_default.xml")
-#Haar Cascade classifier is an effective object detection approach
+from engine.auth.dataset import FaceDataset
+from engine.auth.histogram_index import HistogramIndex
+from engine.auth.identities import IdentityRegistry, defaultName
 
+path = os.path.join(AUTH_DIR, 'samples') # Path for samples taken before the dataset store
+TRAINER_DIR = os.path.join(AUTH_DIR, 'trainer')
+MODEL_PATH = os.path.join(TRAINER_DIR, 'trainer.yml')
 
-def Images_And_Labels(path): # function to fetch the images and labels
 
-    imagePaths = [os.path.join(path,f) for f in os.listdir(path)]     
-    faceSamples=[]
-    ids = []
+def _loadJpeg(imagePath):
+    # runs in a worker process: old samples are already face crops, only decode them
+    gray_img = Image.open(imagePath).convert('L') # convert it to grayscale
+    return np.array(gray_img,'uint8') #creating an array
+
+
+def sampleId(imagePath):
+    return int(os.path.split(imagePath)[-1].split(".")[1])
+
+
+def importSamples(samples=path, dataset=None, workers=None):
+    """Move face.<id>.<n>.jpg samples into the dataset store (users already stored are skipped)"""
+    dataset = dataset or FaceDataset()
+    enrolled = set(dataset.users())
+    byUser = defaultdict(list)
+    for f in sorted(os.listdir(samples)):
+        if f.startswith('face.') and sampleId(f) not in enrolled:
+            byUser[sampleId(f)].append(os.path.join(samples, f))
+
+    imported = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for user_id, imagePaths in byUser.items():
+            faces = list(pool.map(_loadJpeg, imagePaths, chunksize=8))
+            dataset.append(user_id, faces, source='jpeg-import')
+            imported += len(faces)
+    return imported
+
 
-    for imagePath in imagePaths: # to iterate particular image path
+def _manifestPath(model_path):
+    # per user: how many dataset samples are already in the model
+    return os.path.join(os.path.dirname(model_path), 'manifest.json')
 
-        gray_img = Image.open(imagePath).convert('L') # convert it to grayscale
-        img_arr = np.array(gray_img,'uint8') #creating an array
 
-        id = int(os.path.split(imagePath)[-1].split(".")[1])
-        faces = detector.detectMultiScale(img_arr)
+def _loadManifest(model_path):
+    try:
+        with open(_manifestPath(model_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _indexPath(model_path):
+    return os.path.join(os.path.dirname(model_path), 'histograms.npz')
+
+
+def train(dataset=None, model_path=MODEL_PATH, full=False, registry=None):
+    """Train or incrementally update the LBPH model; returns the number of samples added
+
+    Samples are read zero-copy from the dataset store. Only samples appended
+    since the last run are added, with LBPHFaceRecognizer.update(). A full
+    retrain happens when there is no model yet, when full=True, or when a
+    trained user was removed or re-enrolled (LBPH cannot forget samples).
+    The histogram index used for fast rejection is updated the same way, and
+    users missing from the identity registry are registered.
+    """
+    dataset = dataset or FaceDataset()
+    registry = registry or IdentityRegistry()
+    trained = _loadManifest(model_path).get('users', {})
+    current = {str(u): {'count': dataset.count(u), 'created': dataset.info(u)['created']} for u in dataset.users()}
+
+    index = HistogramIndex.load(_indexPath(model_path))
+    retrain = full or not os.path.exists(model_path) or index is None or any(
+        key not in current or current[key]['created'] != info['created'] or current[key]['count'] < info['count']
+        for key, info in trained.items())
+
+    if retrain:
+        index = HistogramIndex()
+    faces = []
+    ids = []
+    for user_id in dataset.users():
+        start = 0 if retrain or str(user_id) not in trained else trained[str(user_id)]['count']
+        samples = dataset.load(user_id, start)
+        faces.extend(samples)  # views into the memmap, nothing is decoded or copied here
+        ids.extend([user_id] * len(samples))
+        if len(samples):
+            index.add(user_id, samples, dataset.load(user_id))
+        if user_id not in registry:
+            registry.add(user_id, dataset.info(user_id).get('name') or defaultName(user_id))
+
+    if not faces:
+        print("Model is up to date, no new samples.")
+        return 0
 
-        for (x,y,w,h) in faces:
-            faceSamples.append(img_arr[y:y+h,x:x+w])
-            ids.append(id)
+    recognizer = cv2.face.LBPHFaceRecognizer_create() # Local Binary Patterns Histograms
+    if retrain:
+        recognizer.train(faces, np.array(ids))
+    else:
+        recognizer.read(model_path)
+        recognizer.update(faces, np.array(ids))
 
-    return faceSamples,ids
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    recognizer.write(model_path)  # Save the trained model as trainer.yml
+    index.save(_indexPath(model_path))
+    with open(_manifestPath(model_path), 'w') as f:
+        json.dump({'users': current}, f)
+    return len(faces)
 
-print ("Training faces. It will take a few seconds. Wait ...")
 
-faces,ids = Images_And_Labels(path)
-recognizer.train(faces, np.array(ids))
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the face recognition model from the enrolled faces")
+    parser.add_argument('--full', action='store_true', help="retrain from scratch instead of adding new samples")
+    parser.add_argument('--import-samples', action='store_true', help="import old face.<id>.<n>.jpg samples first")
+    parser.add_argument('--workers', type=int, default=None, help="decoding processes for --import-samples")
+    args = parser.parse_args()
 
-recognizer.write('engine\\auth\\trainer\\trainer.yml')  # Save the trained model as trainer.yml
+    dataset = FaceDataset()
+    if (args.import_samples or not dataset.users()) and os.path.isdir(path):
+        print(f"Imported {importSamples(path, dataset, args.workers)} samples from {path}")
 
-print("Model trained, Now we can recognize your face.")
\ No newline at end of file
+    print ("Training faces. It will take a few seconds. Wait ...")
+    added = train(dataset, full=args.full)
+    print(f"Model trained with {added} new samples, Now we can recognize your face.")
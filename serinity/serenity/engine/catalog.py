@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import namedtuple
+
+from engine.contacts import editDistance, normalizeName
+from engine.database import getDatabase
+
+Command = namedtuple('Command', 'kind name target')  # kind: 'app' (sys_command) or 'web' (web_command)
+
+
+class CommandTrie:
+    """Prefix tree over command names for completing partial names ("open chro")"""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, key, value):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault('', []).append(value)
+
+    def complete(self, prefix):
+        """Every value whose key starts with prefix"""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        values = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for ch, child in node.items():
+                if ch == '':
+                    values.extend(child)
+                else:
+                    stack.append(child)
+        return values
+
+
+class CommandCatalog:
+    """sys_command, web_command and command_alias loaded into memory
+
+    find() is a dict lookup for exact names and aliases, falling back to a
+    unique prefix completion (of at least min_prefix characters, so "open c"
+    does not launch chrome) and then to the closest name within a small edit
+    distance. The catalog reloads itself when PRAGMA data_version shows the
+    tables were changed by another connection (checked at most once per
+    reload_interval seconds).
+    """
+
+    def __init__(self, database=None, reload_interval=1.0, min_prefix=3):
+        self.db = database or getDatabase()  # tables come from the migrations in database.py
+        self.reload_interval = reload_interval
+        self.min_prefix = min_prefix
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0
+        self.commands = {}
+        self.trie = CommandTrie()
+        self._refresh(force=True)
+
+    def _refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        version = self.db.dataVersion()
+        if version == self._version:
+            return
+
+        commands = {}
+        # apps take precedence over websites with the same name, like the old query order
+        for row in self.db.query("SELECT name, url FROM web_command WHERE name IS NOT NULL"):
+            commands[normalizeName(row[0])] = Command('web', row[0], row[1])
+        for row in self.db.query("SELECT name, path FROM sys_command WHERE name IS NOT NULL"):
+            commands[normalizeName(row[0])] = Command('app', row[0], row[1])
+        names = dict(commands)
+        for key, command in names.items():
+            compact = key.replace(' ', '')
+            commands.setdefault(compact, command)  # "onenote" for "one note"
+        for alias, name in self.db.query("SELECT alias, name FROM command_alias"):
+            command = names.get(normalizeName(name))
+            if command is not None:
+                commands[normalizeName(alias)] = command
+
+        trie = CommandTrie()
+        for key, command in commands.items():
+            trie.add(key, command)
+        self.commands, self.trie, self._version = commands, trie, version
+
+    def find(self, name):
+        """The command for a spoken name, or None"""
+        key = normalizeName(name)
+        if not key:
+            return None
+        with self._lock:
+            self._refresh()
+            command = self.commands.get(key) or self.commands.get(key.replace(' ', ''))
+            if command is not None:
+                return command
+
+            if len(key) >= self.min_prefix:
+                completions = set(self.trie.complete(key))
+                if len(completions) == 1:
+                    return completions.pop()
+
+            limit = max(1, len(key) // 4)
+            best = None
+            for candidate, command in self.commands.items():
+                distance = editDistance(key, candidate, limit)
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, command)
+            return best[1] if best else None
+
+    def addAlias(self, alias, name):
+        """Let another spoken name open an existing command"""
+        self.db.execute("INSERT INTO command_alias (alias, name) VALUES (?, ?)", (alias, name))
+        self._checked_at = 0
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def getCommandCatalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = CommandCatalog()
+        return _catalog
@@ -1,46 +1,75 @@
-import pyttsx3
-import speech_recognition as sr
 import eel
-import time
-def speak(text):
+from gevent.lock import BoundedSemaphore
+from engine.intents import IntentRouter
+from engine.listener import StreamingListener
+from engine.stt import createSTTService
+from engine.tts import SpeechService
+from engine.tts_cache import SpeechAudioCache
+
+# Loaded once at startup and kept resident (offline Vosk or Google, see STT_ENGINE)
+stt_service = createSTTService(language='en-in')
+
+# Microphone stays open between commands so the noise floor is always known
+listener = StreamingListener(stt_service)
+
+# Assistant command intents, in priority order
+command_router = (
+    IntentRouter()
+    .add('open', ['open'])
+    .add('youtube', ['on youtube'])
+    .add('send_message', ['send message', 'send sms'])
+    .add('phone_call', ['phone call'])
+    .add('video_call', ['video call'])
+)
+
+# How to reach a contact
+mode_router = IntentRouter().add('mobile', ['mobile']).add('whatsapp', ['whatsapp'])
+
+# One speech engine for the whole session, started on first use
+speech_service = SpeechService('sapi5', voice_index=0, rate=174, cache=SpeechAudioCache.fromEnv())
+
+def speak(text, on_done=None):
+    """Queue text to be spoken and return immediately"""
     text = str(text)
-    engine = pyttsx3.init('sapi5')
-    voices = engine.getProperty('voices') 
-    engine.setProperty('voice', voices[0].id)
-    engine.setProperty('rate', 174)
     eel.DisplayMessage(text)
-    engine.say(text)
+    utterance = speech_service.say(text, on_done=on_done)
     eel.receiverText(text)
-    engine.runAndWait()
+    return utterance
 
 
 def takecommand():
 
-    r = sr.Recognizer()
-
-    with sr.Microphone() as source:
-        print('listening....')
-        eel.DisplayMessage('listening....')
-        r.pause_threshold = 1
-        r.adjust_for_ambient_noise(source)
-        
-        audio = r.listen(source, 10, 6)
+    # Let a pending prompt finish so the microphone doesn't hear the assistant
+    speech_service.wait()
+    print('listening....')
+    eel.DisplayMessage('listening....')
 
     try:
-        print('recognizing')
-        eel.DisplayMessage('recognizing....')
-        query = r.recognize_google(audio, language='en-in')
+        # Audio is recognized while the user speaks; partial transcripts are shown live
+        query = listener.listen(timeout=10, phrase_time_limit=6, on_partial=eel.DisplayMessage)
+        if not query:
+            return ""
         print(f"user said: {query}")
         eel.DisplayMessage(query)
-        time.sleep(2)
        
     except Exception as e:
         return ""
     
     return query.lower()
 
+# One command at a time, whether it came from the mic button, typed text or a wake word.
+# A gevent lock: every caller runs as a greenlet on eel's hub.
+command_lock = BoundedSemaphore()
+
 @eel.expose
 def allCommands(message=1):
+    with command_lock:
+        runCommand(message)
+
+def runCommand(message=1):
+
+    # Barge-in: a new command interrupts whatever the assistant is saying
+    speech_service.cancel()
 
     if message == 1:
         query = takecommand()
@@ -50,39 +79,41 @@ def allCommands(message=1):
         query = message
         eel.senderText(query)
     try:
+        intent = command_router.intent(query)
 
-        if "open" in query:
+        if intent == 'open':
             from engine.features import openCommand
             openCommand(query)
-        elif "on youtube" in query:
+        elif intent == 'youtube':
             from engine.features import PlayYoutube
             PlayYoutube(query)
         
-        elif "send message" in query or "phone call" in query or "video call" in query:
+        elif intent in ('send_message', 'phone_call', 'video_call'):
             from engine.features import findContact, whatsApp, makeCall, sendMessage
             contact_no, name = findContact(query)
             if(contact_no != 0):
                 speak("Which mode you want to use whatsapp or mobile")
                 preferance = takecommand()
                 print(preferance)
+                mode = mode_router.intent(preferance)
 
-                if "mobile" in preferance:
-                    if "send message" in query or "send sms" in query: 
+                if mode == 'mobile':
+                    if intent == 'send_message': 
                         speak("what message to send")
                         message = takecommand()
                         sendMessage(message, contact_no, name)
-                    elif "phone call" in query:
+                    elif intent == 'phone_call':
                         makeCall(name, contact_no)
                     else:
                         speak("please try again")
-                elif "whatsapp" in preferance:
+                elif mode == 'whatsapp':
                     message = ""
-                    if "send message" in query:
+                    if intent == 'send_message':
                         message = 'message'
                         speak("what message to send")
                         query = takecommand()
                                         
-                    elif "phone call" in query:
+                    elif intent == 'phone_call':
                         message = 'call'
                     else:
                         message = 'video call'
@@ -1 +1,9 @@
-ASSISTANT_NAME = "serenity"
\ No newline at end of file
+import os
+
+ASSISTANT_NAME = "serenity"
+
+# serenity.db next to main.py, independent of the working directory
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "serenity.db")
+
+# Added to phone numbers saved without one
+PHONE_COUNTRY_CODE = os.getenv("PHONE_COUNTRY_CODE", "+91")
\ No newline at end of file
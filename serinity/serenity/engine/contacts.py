@@ -0,0 +1,221 @@
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict, namedtuple
+from contextlib import contextmanager
+
+from engine.config import PHONE_COUNTRY_CODE
+from engine.database import getDatabase
+
+Contact = namedtuple('Contact', 'id name mobile_no')
+Match = namedtuple('Match', 'contact score')
+
+
+def normalizeName(text):
+    """Lowercase words only, so 'Kunal  Sharma!' and 'kunal sharma' compare equal"""
+    return ' '.join(re.findall(r'[a-z0-9]+', str(text).lower()))
+
+
+def normalizePhone(number, country_code=PHONE_COUNTRY_CODE):
+    """'098765 43210', '91-9876543210' and '+91 98765 43210' all become '+919876543210'; None if not a number"""
+    text = str(number or '').strip()
+    if text.lower().startswith('tel:'):
+        text = text[4:]
+    digits = re.sub(r'\D', '', text)
+    if len(digits) < 7:
+        return None
+    if text.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    digits = digits.lstrip('0')  # trunk prefix
+    code = country_code.lstrip('+')
+    if len(digits) > 10 and digits.startswith(code):
+        return '+' + digits
+    return '+' + code + digits
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def editDistance(a, b, limit=None):
+    """Levenshtein distance, giving up (returns limit + 1) once it exceeds limit"""
+    if abs(len(a) - len(b)) > (limit if limit is not None else len(a) + len(b)):
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ContactSearch:
+    """Ranked, typo-tolerant contact lookup
+
+    Names are indexed in memory by word prefix and by trigram, so the common
+    cases never touch the database; an FTS5 trigram index kept in sync by
+    triggers serves substring matches. The in-memory index is rebuilt whenever
+    PRAGMA data_version shows the contacts were changed by another connection.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or getDatabase()
+        self._lock = threading.Lock()
+        self._version = None
+        self.fts_available = self._createIndex()
+        self.contacts = {}
+        self._prefixes = defaultdict(set)
+        self._trigrams = defaultdict(set)
+        self._names = {}
+
+    def _createIndex(self):
+        try:
+            exists = self.db.queryOne("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'")
+            self.db.connection().executescript('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+                    name, content='contacts', content_rowid='id', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+                    INSERT INTO contacts_fts(rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+                    INSERT INTO contacts_fts(contacts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+                    INSERT INTO contacts_fts(contacts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                    INSERT INTO contacts_fts(rowid, name) VALUES (new.id, new.name);
+                END;
+            ''')
+            if not exists:
+                self.rebuildIndex()
+            return True
+        except sqlite3.OperationalError as e:
+            # SQLite older than 3.34 has no trigram tokenizer; the in-memory index still works
+            print(f"⚠️ Contact FTS index not available: {e}")
+            return False
+
+    def rebuildIndex(self):
+        """Rebuild the FTS index from the contacts table (after bulk changes with triggers off)"""
+        with self._lock:
+            if self.db.queryOne("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'"):
+                self.db.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+            self._version = None
+
+    @contextmanager
+    def bulkUpdate(self):
+        """Drop the FTS triggers while the block rewrites contacts, then rebuild the index once"""
+        if self.fts_available:
+            with self.db.transaction() as con:
+                for trigger in ('insert', 'delete', 'update'):
+                    con.execute(f"DROP TRIGGER IF EXISTS contacts_fts_{trigger}")
+        try:
+            yield self.db
+        finally:
+            if self.fts_available:
+                self._createIndex()
+                self.rebuildIndex()
+            self._version = None
+
+    def _refresh(self):
+        version = self.db.dataVersion()
+        if version == self._version:
+            return
+        contacts = {}
+        prefixes = defaultdict(set)
+        grams = defaultdict(set)
+        names = {}
+        for row in self.db.query("SELECT id, name, mobile_no FROM contacts WHERE name IS NOT NULL"):
+            contact = Contact(*row)
+            name = normalizeName(contact.name)
+            if not name:
+                continue
+            contacts[contact.id] = contact
+            names[contact.id] = name
+            for word in name.split():
+                for i in range(1, len(word) + 1):
+                    prefixes[word[:i]].add(contact.id)
+            for gram in trigrams(name):
+                grams[gram].add(contact.id)
+        self.contacts, self._prefixes, self._trigrams, self._names = contacts, prefixes, grams, names
+        self._version = version
+
+    def search(self, query, limit=5):
+        """Best matching contacts for a (possibly misspelled) name, highest score first"""
+        query = normalizeName(query)
+        if not query:
+            return []
+        with self._lock:
+            self._refresh()
+            scores = {}
+
+            # 1. every query word is the start of a word in the name
+            words = query.split()
+            ids = set.intersection(*(self._prefixes.get(word, set()) for word in words))
+            for contact_id in ids:
+                name = self._names[contact_id]
+                if name == query:
+                    scores[contact_id] = 1.0
+                elif name.startswith(query):
+                    scores[contact_id] = 0.95
+                else:
+                    scores[contact_id] = 0.9 - 0.01 * (len(name) - len(query)) / max(len(name), 1)
+
+            # 2. substring anywhere in the name, from the FTS5 trigram index
+            confident = any(score >= 0.9 for score in scores.values())
+            if len(scores) < limit and not confident and self.fts_available and len(query) >= 3:
+                for (contact_id,) in self.db.query(
+                        "SELECT rowid FROM contacts_fts WHERE name LIKE ? LIMIT 50", (f"%{query}%",)):
+                    if contact_id in self._names:
+                        scores.setdefault(contact_id, 0.8)
+
+            # 3. misspellings: candidates sharing trigrams, ranked by edit distance
+            if len(scores) < limit and not confident:
+                query_grams = trigrams(query)
+                shared = Counter()
+                for gram in query_grams:
+                    shared.update(self._trigrams.get(gram, ()))
+                limit_distance = max(1, len(query) // 3)
+                # one typo changes at most three trigrams, so weak overlaps cannot be close
+                min_shared = max(1, len(query_grams) - 3 * limit_distance)
+                for contact_id, count in shared.most_common(20):
+                    if count < min_shared:
+                        break
+                    if contact_id in scores:
+                        continue
+                    name = self._names[contact_id]
+                    # compare with the whole name and with each word ("kunal" vs "kunaal sharma")
+                    distance = min(editDistance(query, part, limit_distance)
+                                   for part in [name] + name.split())
+                    if distance <= limit_distance:
+                        scores[contact_id] = 0.7 * (1 - distance / (len(query) + 1))
+
+            # still under the lock: a refresh on another thread swaps _names and contacts
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+            return [Match(self.contacts[contact_id], round(score, 3)) for contact_id, score in ranked[:limit]]
+
+    def warmUp(self):
+        """Build the in-memory index in the background so the first search does not wait for it"""
+        def load():
+            with self._lock:
+                self._refresh()
+        threading.Thread(target=load, daemon=True).start()
+
+    def stats(self):
+        return {'contacts': len(self.contacts), 'fts': self.fts_available}
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def getContactSearch():
+    global _search
+    with _search_lock:
+        if _search is None:
+            _search = ContactSearch()
+        return _search
@@ -0,0 +1,121 @@
+import itertools
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from engine.config import DB_PATH
+
+# Schema changes in order; PRAGMA user_version records how many have been applied
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS sys_command(id integer primary key, name VARCHAR(100), path VARCHAR(1000));
+    CREATE TABLE IF NOT EXISTS web_command(id integer primary key, name VARCHAR(100), url VARCHAR(1000));
+    CREATE TABLE IF NOT EXISTS contacts(id integer primary key, name VARCHAR(200), mobile_no VARCHAR(255), email VARCHAR(255) NULL);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS command_alias(id integer primary key, alias VARCHAR(100), name VARCHAR(100));
+    CREATE TABLE IF NOT EXISTS face_users(label integer primary key, name VARCHAR(200) NOT NULL,
+        threshold REAL NOT NULL DEFAULT 100, enabled integer NOT NULL DEFAULT 1, created_at REAL);
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts(name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_sys_command_name ON sys_command(name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_web_command_name ON web_command(name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_command_alias_alias ON command_alias(alias COLLATE NOCASE);
+    ''',
+]
+
+_memory_ids = itertools.count()
+
+
+class Database:
+    """serenity.db access shared by every thread
+
+    Each thread gets its own connection (sqlite3 connections and cursors must
+    not be shared between Eel's callback threads), in WAL mode so readers do
+    not block the writer. Statements are prepared once per connection through
+    sqlite3's statement cache. The schema is migrated on first use.
+    """
+
+    def __init__(self, path=DB_PATH, timeout=5.0, cached_statements=256):
+        self.path = path
+        self.uri = False
+        if path == ':memory:':
+            # one shared in-memory database for all threads (tests, benchmarks)
+            self.path = f"file:serenity-memory-{next(_memory_ids)}?mode=memory&cache=shared"
+            self.uri = True
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        # Never writes, so PRAGMA data_version on it changes whenever anyone else commits
+        self._watch = self._connect()
+        self._watch_lock = threading.Lock()
+        with self.transaction() as con:
+            self._migrate(con)
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=self.timeout, uri=self.uri, check_same_thread=False,
+                              cached_statements=self.cached_statements)
+        if not self.uri:
+            con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA foreign_keys=ON")
+        return con
+
+    def connection(self):
+        """This thread's connection"""
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = self._local.con = self._connect()
+        return con
+
+    def _migrate(self, con):
+        version = con.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], version + 1):
+            for statement in script.split(';'):
+                if statement.strip():
+                    con.execute(statement)
+            con.execute(f"PRAGMA user_version = {number}")
+
+    @contextmanager
+    def transaction(self):
+        """Commit the statements run inside the block, or roll them back on error"""
+        con = self.connection()
+        try:
+            yield con
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def queryOne(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        with self.transaction() as con:
+            return con.execute(sql, params).rowcount
+
+    def executemany(self, sql, rows):
+        with self.transaction() as con:
+            return con.executemany(sql, rows).rowcount
+
+    def dataVersion(self):
+        """Changes whenever another connection (thread or process) commits"""
+        with self._watch_lock:
+            return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def getDatabase():
+    """The process-wide Database for serenity.db"""
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = Database()
+        return _database
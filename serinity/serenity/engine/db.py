@@ -1,12 +1,10 @@
-import csv
-import sqlite3
+from engine.database import getDatabase
 
-con = sqlite3.connect("serenity\\serenity.db")
+# Tables and indexes are created by the migrations in database.py
+db = getDatabase()
+con = db.connection()
 cursor = con.cursor()
 
-query = "CREATE TABLE IF NOT EXISTS sys_command(id integer primary key, name VARCHAR(100), path VARCHAR(1000))"
-cursor.execute(query)
-
 # query = "INSERT INTO sys_command VALUES (null,'one note', 'C:\\Program Files\\Microsoft Office\\root\\Office16\\ONENOTE.exe')"
 # cursor.execute(query)
 # con.commit()
@@ -29,20 +27,8 @@ cursor.execute(query)
 #cursor.execute('''CREATE TABLE IF NOT EXISTS contacts (id integer primary key, name VARCHAR(200), mobile_no VARCHAR(255), email VARCHAR(255) NULL)''')
 
 
-# Specify the column indices you want to import (0-based index)
-# Example: Importing the 1st and 3rd columns
-# desired_columns_indices = [0, 30]
-
-# # Read data from CSV and insert into SQLite table for the desired columns
-# with open('contacts.csv', 'r', encoding='utf-8') as csvfile:
-#     csvreader = csv.reader(csvfile)
-#     for row in csvreader:
-#         selected_data = [row[i] for i in desired_columns_indices]
-#         cursor.execute(''' INSERT INTO contacts (id, 'name', 'mobile_no') VALUES (null, ?, ?);''', tuple(selected_data))
-
-# # Commit changes and close connection
-# con.commit()
-# con.close()
+# Import a phonebook export (.vcf or .csv) with batched inserts:
+#   python engine/importer.py contacts contacts.csv
 
 # query = "INSERT INTO contacts VALUES (null,'pawan', '1234567890', 'null')"
 # cursor.execute(query)
@@ -0,0 +1,84 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+
+def createChannel(maxsize=16):
+    """Queue carrying events from the hotword process to the assistant process"""
+    return multiprocessing.Queue(maxsize)
+
+
+def publish(channel, type, **data):
+    """Send an event (with the time it happened) without ever blocking the sender"""
+    event = dict(data, type=type)
+    event.setdefault('timestamp', time.time())
+    try:
+        channel.put_nowait(event)
+    except queue.Full:
+        # Nobody is consuming (UI not up yet); dropping is better than stalling the microphone
+        pass
+
+
+class EventConsumer:
+    """Dispatches events from the channel to handlers on a background thread
+
+    Events older than max_age seconds (e.g. queued while face authentication
+    was still running) are dropped instead of being replayed late.
+
+    Handlers that talk to a gevent based UI (eel) must run on its hub, not on
+    a native thread: pass spawn=eel.spawn and sleep=eel.sleep and the channel
+    is polled from a greenlet instead of blocking a thread in get().
+    """
+
+    def __init__(self, channel, max_age=5.0, spawn=None, sleep=None, poll_interval=0.05):
+        self.channel = channel
+        self.max_age = max_age
+        self.spawn = spawn
+        self.sleep = sleep or time.sleep
+        self.poll_interval = poll_interval
+        self.handlers = {}
+        self._thread = None
+
+    def on(self, type, handler):
+        self.handlers[type] = handler
+        return self
+
+    def start(self):
+        if self._thread is None:
+            if self.spawn is not None:
+                self._thread = self.spawn(self._poll)
+            else:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                event = self.channel.get()
+            except (EOFError, OSError):
+                break  # the other process went away
+            self._dispatch(event)
+
+    def _poll(self):
+        # never blocks: a blocking get() would stall every other greenlet on the hub
+        while True:
+            try:
+                event = self.channel.get_nowait()
+            except queue.Empty:
+                self.sleep(self.poll_interval)
+                continue
+            except (EOFError, OSError):
+                break
+            self._dispatch(event)
+
+    def _dispatch(self, event):
+        if time.time() - event.get('timestamp', 0) > self.max_age:
+            return
+        handler = self.handlers.get(event.get('type'))
+        if handler is None:
+            return
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"event handler error: {e}")
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import shlex
+import sys
+import time
+
+HOME = 'com.android.launcher3/com.android.launcher3.Launcher'
+
+
+class FakePhone:
+    """Just enough of `adb shell` to drive engine/adb.py without a phone
+
+    Set ADB_PATH="python engine/fake_adb.py" to use it. Every command is
+    appended to FAKE_ADB_LOG (if set). FAKE_ADB_SCREENS points to a JSON file
+    mapping taps to what they open, e.g.
+    {"136,2220": {"focus": "com.android.mms/.ui.ConversationList",
+                  "elements": [{"content-desc": "Start chat", "bounds": "[760,2130][880,2250]"}]},
+     "390,2270": {"keyboard": true, "text": ["Type message"]}}
+    The home screen's elements can be given under "home".
+    FAKE_ADB_LATENCY adds a delay (seconds) to every input command, roughly
+    what `input` costs on a real phone.
+    """
+
+    def __init__(self, screens=None, log=None, latency=0.0):
+        self.screens = screens or {}
+        self.log = log
+        self.latency = latency
+        self.focus = HOME
+        self.keyboard = False
+        self.texts = []
+        self.elements = list(self.screens.get('home', {}).get('elements', []))
+        self.history = []
+        self.status = 0
+
+    def open(self, focus):
+        if focus != self.focus:
+            self.history.append(self.focus)
+        self.focus = focus
+        self.keyboard = False
+        self.texts = []
+        self.elements = list(self.screens.get('home', {}).get('elements', [])) if focus == HOME else []
+
+    def input(self, args):
+        time.sleep(self.latency)
+        if args[:1] == ['keyevent']:
+            for code in args[1:]:
+                if code in ('3', 'KEYCODE_HOME'):
+                    self.history.clear()
+                    self.open(HOME)
+                elif code in ('4', 'KEYCODE_BACK'):
+                    if self.keyboard:
+                        self.keyboard = False
+                    elif self.history:
+                        self.focus = self.history.pop()
+        elif args[:1] == ['tap'] and len(args) == 3:
+            screen = self.screens.get(f"{args[1]},{args[2]}", {})
+            if 'focus' in screen:
+                self.open(screen['focus'])
+            self.keyboard = screen.get('keyboard', self.keyboard)
+            self.texts += screen.get('text', [])
+            self.elements += screen.get('elements', [])
+        elif args[:1] == ['text'] and len(args) == 2:
+            self.texts.append(args[1].replace('%s', ' '))
+        return ''
+
+    def execute(self, line):
+        # pipes and redirections are ignored: the output below is already "grepped"
+        command = re.split(r'\s*(?:\||&&|>)\s*', line, maxsplit=1)[0]
+        try:
+            args = shlex.split(command)
+        except ValueError:
+            return '/system/bin/sh: syntax error', 2
+        if not args:
+            return None, self.status
+        name = args[0]
+        if name == 'echo':
+            return ' '.join(args[1:]).replace('$?', str(self.status)), 0
+        if name == 'exit':
+            sys.exit(0)
+        if name == 'input':
+            return self.input(args[1:]), 0
+        if name == 'am' and args[1:2] == ['start']:
+            if 'tel:' in command:
+                self.open('com.android.dialer/com.android.incallui.InCallActivity')
+            elif '-n' in args:
+                self.open(args[args.index('-n') + 1])
+            elif 'sms:' in command or 'smsto:' in command:
+                self.open('com.android.mms/com.android.mms.ui.ComposeMessageActivity')
+                self.texts += [a for a in args if a.startswith(('sms:', 'smsto:'))]
+            return 'Starting: Intent { }', 0
+        if name == 'dumpsys' and args[1:2] == ['window']:
+            return f"  mCurrentFocus=Window{{1f2e3d u0 {self.focus}}}", 0
+        if name == 'dumpsys' and args[1:2] == ['input_method']:
+            return f"  mInputShown={str(self.keyboard).lower()}", 0
+        if name == 'cmd' and args[1:3] == ['package', 'resolve-activity']:
+            return HOME, 0
+        if name == 'uiautomator':
+            nodes = ''.join(f'<node text="{text}" />' for text in self.texts)
+            nodes += ''.join('<node ' + ' '.join(f'{k}="{v}"' for k, v in element.items()) + ' />'
+                             for element in self.elements)
+            return f'<?xml version="1.0" ?><hierarchy>{nodes}</hierarchy>', 0
+        return f"/system/bin/sh: {name}: not found", 127
+
+    def serve(self, stdin, stdout):
+        for line in stdin:
+            line = line.strip()
+            if self.log:
+                with open(self.log, 'a') as f:
+                    f.write(line + '\n')
+            output, self.status = self.execute(line)
+            if output:
+                stdout.write(output + '\n')
+                stdout.flush()
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['-s']:
+        args = args[2:]
+    if args[:1] != ['shell']:
+        sys.exit(f"fake adb only understands 'shell', got {args}")
+    screens = {}
+    if os.environ.get('FAKE_ADB_SCREENS'):
+        with open(os.environ['FAKE_ADB_SCREENS']) as f:
+            screens = json.load(f)
+    phone = FakePhone(screens, os.environ.get('FAKE_ADB_LOG'), float(os.environ.get('FAKE_ADB_LATENCY', 0)))
+    if len(args) > 1:
+        # one-shot "adb shell <command>", like os.system used to run
+        output, status = phone.execute(' '.join(args[1:]))
+        if output:
+            print(output)
+        sys.exit(status)
+    phone.serve(sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
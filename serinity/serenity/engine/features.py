@@ -1,39 +1,37 @@
 import os
-from shlex import quote
 import re
-import sqlite3
-import struct
-import subprocess
-import time
+import shutil
+import urllib.parse
 import webbrowser
 from playsound import playsound
 import eel
-import pyaudio
-import pyautogui
 from engine.command import speak
 from engine.config import ASSISTANT_NAME
+from engine.macros import (Macro, Step, Not, WindowTitle, ScreenChanged, FocusedApp, KeyboardShown, UiElement,
+                           openUrl, snapshot, hotkey, press, keyEvents, typeText, tapElement)
 # Playing assiatnt sound function
 import pywhatkit as kit
-import pvporcupine
 import pygame
 
 from engine.helper import extract_yt_term, remove_words
 from hugchat import hugchat
 
-con = sqlite3.connect("serenity\\serenity.db")
-cursor = con.cursor()
-
-@eel.expose
-def playAssistantSound():
+def startAssistantSound():
+    """Start the start sound without waiting for it to finish"""
     music_dir = "serenity\\www\\assets\\audio\\start_sound.mp3"
     pygame.mixer.init()
     pygame.mixer.music.load(music_dir)
     pygame.mixer.music.play()
+
+@eel.expose
+def playAssistantSound():
+    startAssistantSound()
     while pygame.mixer.music.get_busy():
         pygame.time.Clock().tick(10)
 
     
 def openCommand(query):
+    from engine.catalog import getCommandCatalog
     query = query.replace(ASSISTANT_NAME, "")
     query = query.replace("open", "")
     query.lower()
@@ -43,29 +41,27 @@ def openCommand(query):
     if app_name != "":
 
         try:
-            cursor.execute(
-                'SELECT path FROM sys_command WHERE name IN (?)', (app_name,))
-            results = cursor.fetchall()
-
-            if len(results) != 0:
-                speak("Opening "+query)
-                os.startfile(results[0][0])
-
-            elif len(results) == 0: 
-                cursor.execute(
-                'SELECT url FROM web_command WHERE name IN (?)', (app_name,))
-                results = cursor.fetchall()
-                
-                if len(results) != 0:
-                    speak("Opening "+query)
-                    webbrowser.open(results[0][0])
-
+            # one in-memory lookup (names, aliases, prefixes, typos) instead of two queries
+            command = getCommandCatalog().find(app_name)
+
+            if command is None:
+                # not in the catalog: let the shell find it, like 'start' did (PATH, then App Paths
+                # such as chrome or winword); unlike 'start' it raises instead of showing an error box
+                name = app_name.replace(" ", "")
+                try:
+                    os.startfile(shutil.which(name) or name)
+                except OSError:
+                    speak("not found")
                 else:
                     speak("Opening "+query)
-                    try:
-                        os.system('start '+query)
-                    except:
-                        speak("not found")
+
+            elif command.kind == 'app':
+                speak("Opening "+command.name)
+                os.startfile(command.target)
+
+            else:
+                speak("Opening "+command.name)
+                webbrowser.open(command.target)
         except:
             speak("some thing went wrong")
 
@@ -77,46 +73,6 @@ def PlayYoutube(query):
     kit.playonyt(search_term)
 
 
-def hotword():
-    porcupine=None
-    paud=None
-    audio_stream=None
-    try:
-       
-        # pre trained keywords    
-        porcupine=pvporcupine.create(keywords=["serenity","alexa"]) 
-        paud=pyaudio.PyAudio()
-        audio_stream=paud.open(rate=porcupine.sample_rate,channels=1,format=pyaudio.paInt16,input=True,frames_per_buffer=porcupine.frame_length)
-        
-        # loop for streaming
-        while True:
-            keyword=audio_stream.read(porcupine.frame_length)
-            keyword=struct.unpack_from("h"*porcupine.frame_length,keyword)
-
-            # processing keyword comes from mic 
-            keyword_index=porcupine.process(keyword)
-
-            # checking first keyword detetcted for not
-            if keyword_index>=0:
-                print("hotword detected")
-
-                # pressing shorcut key win+j
-                import pyautogui as autogui
-                autogui.keyDown("win")
-                autogui.press("j")
-                time.sleep(2)
-                autogui.keyUp("win")
-                
-    except:
-        if porcupine is not None:
-            porcupine.delete()
-        if audio_stream is not None:
-            audio_stream.close()
-        if paud is not None:
-            paud.terminate()
-
-
-
 # find contacts
 def findContact(query):
     
@@ -124,20 +80,47 @@ def findContact(query):
     query = remove_words(query, words_to_remove)
 
     try:
+        from engine.contacts import getContactSearch, normalizePhone
         query = query.strip().lower()
-        cursor.execute("SELECT mobile_no FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?", ('%' + query + '%', query + '%'))
-        results = cursor.fetchall()
-        print(results[0][0])
-        mobile_number_str = str(results[0][0])
-
-        if not mobile_number_str.startswith('+91'):
-            mobile_number_str = '+91' + mobile_number_str
+        # ranked, typo-tolerant match instead of the first LIKE row
+        matches = getContactSearch().search(query)
+        contact = matches[0].contact
+        mobile_number_str = normalizePhone(contact.mobile_no) or str(contact.mobile_no).replace(" ", "")
 
-        return mobile_number_str, query
+        return mobile_number_str, contact.name
     except:
         speak('not exist in contacts')
         return 0, 0
     
+# WhatsApp Desktop: open the chat, then tab from the search box to the send / call / video call button.
+# Launching is skipped when WhatsApp is already in front (without pygetwindow: the old fixed delay).
+# The keys are only pressed once the window shows the new chat, never into the chat open before;
+# if it never changes (that chat was already open) they go after the timeout.
+whatsAppMacro = Macro('whatsapp', [
+    Step('launch whatsapp', action=openUrl("whatsapp://send?phone={mobile_no}&text={text}"),
+         when=Not(WindowTitle('WhatsApp')), until=WindowTitle('WhatsApp'), timeout=15, fallback=5),
+    Step('remember chat', action=snapshot('chat', window='WhatsApp')),
+    Step('open chat', action=openUrl("whatsapp://send?phone={mobile_no}&text={text}"),
+         until=ScreenChanged('chat'), timeout=5, fallback=2),
+    Step('search box', action=hotkey('ctrl', 'f')),
+    Step('select button', action=press('tab', presses='tabs')),
+    Step('press button', action=press('enter')),
+])
+
+# SMS through the phone's Messages app; elements are found on screen, the coordinates are fallbacks
+smsMacro = Macro('sms', [
+    Step('home', action=keyEvents(*[4] * 6, 3), until=FocusedApp('home'), timeout=5),
+    Step('open messages', action=tapElement(description='Messages', fallback=(136, 2220)),
+         until=Not(FocusedApp('home')), timeout=5),
+    Step('start chat', action=tapElement(text='Start chat', fallback=(819, 2192)), until=KeyboardShown(), timeout=3),
+    Step('search number', action=typeText('{mobile_no}'), until=UiElement(text='{name}'), timeout=3),
+    Step('pick contact', action=tapElement(text='{name}', fallback=(601, 574))),
+    Step('message box', wait=UiElement(resource_id='compose_message_text'), timeout=3,
+         action=tapElement(resource_id='compose_message_text', fallback=(390, 2270))),
+    Step('type message', action=typeText('{message}'), wait=KeyboardShown(), timeout=3),
+    Step('send', action=tapElement(description='Send', fallback=(957, 1397))),
+])
+
 def whatsApp(mobile_no, message, flag, name):
     
 
@@ -157,25 +140,9 @@ def whatsApp(mobile_no, message, flag, name):
 
 
     # Encode the message for URL
-    encoded_message = quote(message)
+    encoded_message = urllib.parse.quote(message)
     print(encoded_message)
-    # Construct the URL
-    whatsapp_url = f"whatsapp://send?phone={mobile_no}&text={encoded_message}"
-
-    # Construct the full command
-    full_command = f'start "" "{whatsapp_url}"'
-
-    # Open WhatsApp with the constructed URL using cmd.exe
-    subprocess.run(full_command, shell=True)
-    time.sleep(5)
-    subprocess.run(full_command, shell=True)
-    
-    pyautogui.hotkey('ctrl', 'f')
-
-    for i in range(1, target_tab):
-        pyautogui.hotkey('tab')
-
-    pyautogui.hotkey('enter')
+    whatsAppMacro.run(mobile_no=mobile_no, text=encoded_message, tabs=target_tab - 1)
     speak(serenity_message)
 
 # chat bot 
@@ -192,33 +159,15 @@ def chatBot(query):
 # android automation
 
 def makeCall(name, mobileNo):
+    from engine.adb import getAndroidDevice
     mobileNo =mobileNo.replace(" ", "")
     speak("Calling "+name)
-    command = 'adb shell am start -a android.intent.action.CALL -d tel:'+mobileNo
-    os.system(command)
+    getAndroidDevice().startActivity('-a', 'android.intent.action.CALL', '-d', 'tel:'+mobileNo)
 
 
 # to send message
 def sendMessage(message, mobileNo, name):
-    from engine.helper import replace_spaces_with_percent_s, goback, keyEvent, tapEvents, adbInput
-    message = replace_spaces_with_percent_s(message)
-    mobileNo = replace_spaces_with_percent_s(mobileNo)
+    from engine.adb import getAndroidDevice
     speak("sending message")
-    goback(4)
-    time.sleep(1)
-    keyEvent(3)
-    # open sms app
-    tapEvents(136, 2220)
-    #start chat
-    tapEvents(819, 2192)
-    # search mobile no
-    adbInput(mobileNo)
-    #tap on name
-    tapEvents(601, 574)
-    # tap on input
-    tapEvents(390, 2270)
-    #message
-    adbInput(message)
-    #send
-    tapEvents(957, 1397)
+    smsMacro.run(device=getAndroidDevice(), mobile_no=mobileNo, message=message, name=name)
     speak("message send successfully to "+name)
\ No newline at end of file
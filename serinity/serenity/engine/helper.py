@@ -1,6 +1,6 @@
-import os
 import re
-import time
+
+from engine.adb import getAndroidDevice
 
 
 def extract_yt_term(command):
@@ -28,26 +28,19 @@ def remove_words(input_string, words_to_remove):
 
 # key events like receive call, stop call, go back
 def keyEvent(key_code):
-    command =  f'adb shell input keyevent {key_code}'
-    os.system(command)
-    time.sleep(1)
+    getAndroidDevice().keyEvents(key_code)
 
 # Tap event used to tap anywhere on screen
 def tapEvents(x, y):
-    command =  f'adb shell input tap {x} {y}'
-    os.system(command)
-    time.sleep(1)
+    getAndroidDevice().tap(x, y)
 
 # Input Event is used to insert text in mobile
 def adbInput(message):
-    command =  f'adb shell input text "{message}"'
-    os.system(command)
-    time.sleep(1)
+    getAndroidDevice().text(message)
 
-# to go complete back
+# to go complete back (one adb round trip for all six presses)
 def goback(key_code):
-    for i in range(6):
-        keyEvent(key_code)
+    getAndroidDevice().keyEvents(*[key_code] * 6)
 
 # To replace space in string with %s for complete message send
 def replace_spaces_with_percent_s(input_string):
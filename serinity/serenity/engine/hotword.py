@@ -0,0 +1,145 @@
+import time
+from collections import deque
+
+import pvporcupine
+import pyaudio
+
+from engine.vad import VoiceActivityDetector, frameRMS
+
+
+def pcmView(frame):
+    """int16 samples of a raw PCM frame, as the sequence of ints Porcupine expects
+
+    Porcupine copies the samples into a ctypes array itself; a memoryview
+    yields plain ints for that copy, where a numpy array would yield slower
+    numpy scalars.
+    """
+    return memoryview(frame).cast('h')
+
+
+class HotwordListener:
+    """Always-on wake word detection that stays cheap while the room is quiet
+
+    Frames are handed to Porcupine as int16 memoryviews of the audio buffer
+    instead of struct-unpacked tuples. An energy gate skips keyword inference
+    during silence; when sound starts the last few gated frames are replayed
+    so the start of the wake word is not lost, and inference continues for a
+    short hangover after it stops.
+    """
+
+    def __init__(self, keywords=("serenity", "alexa"), on_wake=None, gate=True,
+                 preroll_frames=8, hangover_ms=700, report_interval=300):
+        self.keywords = list(keywords)
+        self.on_wake = on_wake  # on_wake(keyword, timestamp)
+        self.gate = gate
+        self.vad = VoiceActivityDetector(speech_ratio=2.0, min_energy=150)
+        self.preroll = deque(maxlen=preroll_frames)
+        self.hangover_ms = hangover_ms
+        self.report_interval = report_interval
+        self.frames = 0
+        self.processed = 0
+        self.detections = 0
+        self._running = False
+        self._cpu_mark = None
+
+    def run(self):
+        """Listen until stop() is called or the audio device fails"""
+        porcupine = None
+        paud = None
+        audio_stream = None
+        try:
+            # pre trained keywords
+            porcupine = pvporcupine.create(keywords=self.keywords)
+            paud = pyaudio.PyAudio()
+            audio_stream = paud.open(rate=porcupine.sample_rate, channels=1, format=pyaudio.paInt16,
+                                     input=True, frames_per_buffer=porcupine.frame_length)
+            frame_ms = 1000 * porcupine.frame_length / porcupine.sample_rate
+            hangover_frames = int(self.hangover_ms / frame_ms)
+            active_frames = 0
+            self._running = True
+            self._cpu_mark = (time.process_time(), time.monotonic(), 0, 0)
+
+            # loop for streaming
+            while self._running:
+                frame = audio_stream.read(porcupine.frame_length, exception_on_overflow=False)
+                self.frames += 1
+
+                if self.gate:
+                    if self.vad.isSpeech(frameRMS(frame)):
+                        active_frames = hangover_frames
+                    elif active_frames > 0:
+                        active_frames -= 1
+                    else:
+                        # Silence: keep the frame for pre-roll and skip inference
+                        self.preroll.append(frame)
+                        self._maybeReport()
+                        continue
+
+                for buffered in self.preroll:
+                    self._process(porcupine, buffered)
+                self.preroll.clear()
+                self._process(porcupine, frame)
+                self._maybeReport()
+        except Exception as e:
+            print(f"Hotword listener stopped: {e}")
+        finally:
+            self._running = False
+            if porcupine is not None:
+                porcupine.delete()
+            if audio_stream is not None:
+                audio_stream.close()
+            if paud is not None:
+                paud.terminate()
+
+    def stop(self):
+        self._running = False
+
+    def _process(self, porcupine, frame):
+        self.processed += 1
+        # processing keyword comes from mic
+        keyword_index = porcupine.process(pcmView(frame))
+        if keyword_index >= 0:
+            self.detections += 1
+            print("hotword detected")
+            if self.on_wake:
+                self.on_wake(self.keywords[keyword_index], time.time())
+
+    def cpuUsage(self):
+        """(CPU %, share of frames skipped by the gate) since the last call"""
+        cpu, wall, frames, processed = self._cpu_mark
+        now = (time.process_time(), time.monotonic(), self.frames, self.processed)
+        self._cpu_mark = now
+        elapsed = now[1] - wall
+        cpu_percent = 100 * (now[0] - cpu) / elapsed if elapsed > 0 else 0.0
+        new_frames = now[2] - frames
+        gated = 1 - (now[3] - processed) / new_frames if new_frames else 0.0
+        return cpu_percent, gated
+
+    def _maybeReport(self):
+        if self.report_interval and time.monotonic() - self._cpu_mark[1] >= self.report_interval:
+            cpu_percent, gated = self.cpuUsage()
+            print(f"🎙️ Hotword listener: CPU {cpu_percent:.1f}%, {gated:.0%} of frames skipped in silence")
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'processed': self.processed,
+            'detections': self.detections,
+            'noise_floor': self.vad.noise_floor,
+        }
+
+
+def listen(events, keywords=("serenity", "alexa")):
+    """Entry point of the hotword process: publish a 'wake' event for every detection
+
+    Only the listener and the event channel are imported here, not
+    engine.features / engine.command, so this always-on process never loads
+    the speech recognizer or the speech engine.
+    """
+    from engine.events import publish
+
+    def onWake(keyword, timestamp):
+        # tell the assistant process directly, it starts listening right away
+        publish(events, 'wake', keyword=keyword, timestamp=timestamp)
+
+    HotwordListener(keywords=keywords, on_wake=onWake).run()
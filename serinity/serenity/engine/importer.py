@@ -0,0 +1,260 @@
+import argparse
+import csv
+import os
+import quopri
+import re
+import sys
+import time
+from collections import Counter, namedtuple
+from contextlib import nullcontext
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ENGINE_DIR))  # so engine.* imports work when run as a script
+
+from engine.config import PHONE_COUNTRY_CODE
+from engine.contacts import getContactSearch, normalizeName, normalizePhone
+from engine.database import getDatabase
+
+ContactRecord = namedtuple('ContactRecord', 'name mobile_no email')
+CommandRecord = namedtuple('CommandRecord', 'name target')
+
+BATCH_SIZE = 1000
+
+# Header names used by Google, Outlook and phone exports, most specific first
+NAME_COLUMNS = ['name', 'full name', 'display name', 'file as']
+GIVEN_COLUMNS = ['given name', 'first name']
+FAMILY_COLUMNS = ['family name', 'last name']
+PHONE_COLUMNS = ['mobile phone', 'phone 1 - value', 'mobile', 'mobile_no', 'phone', 'primary phone', 'home phone',
+                 'business phone', 'phone number']
+EMAIL_COLUMNS = ['e-mail 1 - value', 'e-mail address', 'email', 'e-mail', 'email address']
+
+
+def _open(source):
+    """A path is opened (and closed) here, an already open text stream is used as is"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding='utf-8-sig', newline='')
+    return nullcontext(source)
+
+
+def _column(header, wanted):
+    for name in wanted:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def _columnIndex(header, column):
+    if column is None or isinstance(column, int):
+        return column
+    if column.isdigit():
+        return int(column)
+    return header.index(column.strip().lower())
+
+
+def readContactsCSV(source, name_column=None, phone_column=None, email_column=None, header=True):
+    """Stream ContactRecords from a CSV export; columns are picked from the header unless given (name or index)"""
+    with _open(source) as f:
+        reader = csv.reader(f)
+        columns = [c.strip().lower() for c in next(reader, [])] if header else []
+        name = _columnIndex(columns, name_column)
+        phone = _columnIndex(columns, phone_column)
+        email = _columnIndex(columns, email_column)
+        given = family = None
+        if name is None:
+            name = _column(columns, NAME_COLUMNS)
+            given, family = _column(columns, GIVEN_COLUMNS), _column(columns, FAMILY_COLUMNS)
+        if phone is None:
+            phone = _column(columns, PHONE_COLUMNS)
+        if email is None:
+            email = _column(columns, EMAIL_COLUMNS)
+        if (name is None and given is None) or phone is None:
+            raise ValueError(f"Cannot tell the name and phone columns apart in {columns}, pass them explicitly")
+
+        def cell(row, index):
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        for row in reader:
+            full_name = cell(row, name) or ' '.join(filter(None, (cell(row, given), cell(row, family))))
+            # Google exports keep several numbers in one cell: "+91 98765 43210 ::: 080 1234567"
+            numbers = cell(row, phone).split(':::')
+            yield ContactRecord(full_name, numbers[0].strip(), cell(row, email) or None)
+
+
+def _unfoldLines(lines):
+    """Join vCard continuation lines (leading whitespace, or a trailing '=' in quoted-printable values)"""
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if current is not None:
+            if line[:1] in (' ', '\t'):
+                current += line[1:]
+                continue
+            if current.endswith('=') and 'QUOTED-PRINTABLE' in current.split(':', 1)[0].upper():
+                current = current[:-1] + line
+                continue
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _vcardValue(params, value):
+    if any(p.upper() in ('ENCODING=QUOTED-PRINTABLE', 'QUOTED-PRINTABLE') for p in params):
+        charset = next((p.split('=', 1)[1] for p in params if p.upper().startswith('CHARSET=')), 'utf-8')
+        raw = quopri.decodestring(value.encode('ascii', 'replace'))
+        try:
+            value = raw.decode(charset, 'replace')
+        except LookupError:  # unknown CHARSET= in the export
+            value = raw.decode('utf-8', 'replace')
+    return value.replace('\\,', ',').replace('\\;', ';').replace('\\n', ' ').strip()
+
+
+def readVCards(source):
+    """Stream ContactRecords from a .vcf phonebook export, one per card (mobile numbers preferred)"""
+    with _open(source) as f:
+        card = None
+        for line in _unfoldLines(f):
+            key, _, value = line.partition(':')
+            prop, *params = key.split(';')
+            prop = prop.rsplit('.', 1)[-1].upper()  # "item1.TEL" -> "TEL"
+            if prop == 'BEGIN' and value.strip().upper() == 'VCARD':
+                card = {'fn': '', 'n': '', 'tel': [], 'email': None}
+            elif card is None:
+                continue
+            elif prop == 'END':
+                if card['tel']:
+                    card['tel'].sort(key=lambda tel: tel[0])
+                    yield ContactRecord(card['fn'] or card['n'], card['tel'][0][1], card['email'])
+                card = None
+            elif prop == 'FN':
+                card['fn'] = _vcardValue(params, value)
+            elif prop == 'N':
+                family, given = (_vcardValue(params, value).split(';') + ['', ''])[:2]
+                card['n'] = ' '.join(filter(None, (given.strip(), family.strip())))
+            elif prop == 'TEL':
+                kinds = ';'.join(params).upper()
+                card['tel'].append((not ('CELL' in kinds or 'PREF' in kinds), _vcardValue(params, value)))
+            elif prop == 'EMAIL' and not card['email']:
+                card['email'] = _vcardValue(params, value) or None
+
+
+def readContacts(source, filename=None, **columns):
+    """ContactRecords from a vCard or CSV file, picked by extension (columns only apply to CSV)"""
+    filename = filename or (source if isinstance(source, str) else '')
+    if filename.lower().endswith(('.vcf', '.vcard')):
+        return readVCards(source)
+    return readContactsCSV(source, **columns)
+
+
+def readCommandsCSV(source):
+    """Stream CommandRecords from 'name,path' / 'name,url' rows (a header row is skipped)"""
+    with _open(source) as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].strip() or row[1].strip().lower() in ('path', 'url', 'target'):
+                continue
+            yield CommandRecord(row[0].strip(), row[1].strip())
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def importContacts(records, search=None, batch_size=BATCH_SIZE, country_code=PHONE_COUNTRY_CODE, replace=False):
+    """Insert ContactRecords in batched transactions, skipping numbers already saved; returns counts"""
+    search = search or getContactSearch()
+    started = time.perf_counter()
+    stats = Counter()
+
+    def rows(db):
+        # one contact per phone number, whichever way it was written
+        seen = set()
+        if not replace:
+            seen = {normalizePhone(number, country_code) for (number,) in db.query("SELECT mobile_no FROM contacts")}
+        for record in records:
+            stats['read'] += 1
+            name = ' '.join(str(record.name or '').split())
+            phone = normalizePhone(record.mobile_no, country_code)
+            if not name or not phone:
+                stats['invalid'] += 1
+            elif phone in seen:
+                stats['duplicates'] += 1
+            else:
+                seen.add(phone)
+                yield name, phone, record.email
+
+    with search.bulkUpdate() as db:
+        if replace:
+            db.execute("DELETE FROM contacts")
+        for batch in _batches(rows(db), batch_size):
+            db.executemany("INSERT INTO contacts (name, mobile_no, email) VALUES (?, ?, ?)", batch)
+            stats['imported'] += len(batch)
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return dict(stats)
+
+
+def importCommands(records, database=None, batch_size=BATCH_SIZE):
+    """Insert CommandRecords into sys_command (paths) or web_command (URLs), skipping names already saved"""
+    db = database or getDatabase()
+    started = time.perf_counter()
+    stats = Counter()
+    seen = {normalizeName(name) for (name,) in db.query("SELECT name FROM sys_command UNION SELECT name FROM web_command")}
+    apps, websites = [], []
+    for record in records:
+        stats['read'] += 1
+        key = normalizeName(record.name)
+        if not key or not record.target:
+            stats['invalid'] += 1
+            continue
+        if key in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(key)
+        is_url = re.match(r'(https?://|www\.)', record.target, re.IGNORECASE)
+        (websites if is_url else apps).append((record.name, record.target))
+
+    for table, column, rows in (('sys_command', 'path', apps), ('web_command', 'url', websites)):
+        for batch in _batches(rows, batch_size):
+            db.executemany(f"INSERT INTO {table} (name, {column}) VALUES (?, ?)", batch)
+            stats['imported'] += len(batch)
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return dict(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import contacts or app/website commands into serenity.db")
+    sub = parser.add_subparsers(dest='kind', required=True)
+    contacts = sub.add_parser('contacts', help="import a .vcf or .csv phonebook export")
+    contacts.add_argument('path')
+    contacts.add_argument('--name-column', help="CSV column (header name or 0-based index) holding the name")
+    contacts.add_argument('--phone-column', help="CSV column holding the phone number")
+    contacts.add_argument('--email-column', help="CSV column holding the e-mail address")
+    contacts.add_argument('--no-header', action='store_true', help="the CSV has no header row")
+    contacts.add_argument('--country-code', default=PHONE_COUNTRY_CODE, help="added to numbers saved without one")
+    contacts.add_argument('--replace', action='store_true', help="delete existing contacts first")
+    contacts.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    commands = sub.add_parser('commands', help="import a name,path / name,url CSV")
+    commands.add_argument('path')
+    commands.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.kind == 'contacts':
+        columns = {'name_column': args.name_column, 'phone_column': args.phone_column,
+                   'email_column': args.email_column, 'header': not args.no_header}
+        stats = importContacts(readContacts(args.path, **columns), batch_size=args.batch_size,
+                               country_code=args.country_code, replace=args.replace)
+    else:
+        stats = importCommands(readCommandsCSV(args.path), batch_size=args.batch_size)
+    print(f"✅ Imported {stats.get('imported', 0)} of {stats.get('read', 0)} {args.kind} "
+          f"({stats.get('duplicates', 0)} duplicates, {stats.get('invalid', 0)} invalid) in {stats['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
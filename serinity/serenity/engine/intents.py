@@ -0,0 +1,98 @@
+import re
+
+
+# Words are letters/digits with inner apostrophes, so "what's" stays one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+
+class IntentMatch:
+    """Result of routing a query: the intent, the phrase that matched and its slots"""
+
+    def __init__(self, intent, phrase, start, end, query, slots=None):
+        self.intent = intent
+        self.phrase = phrase
+        self.start = start  # character span of the matched phrase in the query
+        self.end = end
+        self.query = query
+        self.slots = slots or {}
+
+    @property
+    def before(self):
+        return self.query[:self.start].strip()
+
+    @property
+    def rest(self):
+        return self.query[self.end:].strip()
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r}, phrase={self.phrase!r}, slots={self.slots!r})"
+
+
+class IntentRouter:
+    """Routes a query to an intent by whole-word keyword/phrase matching
+
+    Every phrase of every intent is compiled into one token index keyed on the
+    phrase's first word, so a query is routed in a single pass over its words
+    and the cost does not grow with the number of intents. Intents are tried in
+    the order they were added: when several match, the first added wins, just
+    like an if/elif chain.
+    """
+
+    def __init__(self):
+        self._intents = []
+        self._index = {}
+
+    def add(self, intent, phrases, anchored=False, extract=None):
+        """Register an intent
+
+        phrases  - keywords or multi-word phrases that trigger the intent
+        anchored - only match when the phrase starts the query
+        extract  - optional function(match) -> dict of slots
+        """
+        priority = len(self._intents)
+        self._intents.append((intent, extract))
+        for phrase in phrases:
+            words = tuple(TOKEN_PATTERN.findall(phrase.lower()))
+            if words:
+                self._index.setdefault(words[0], []).append((words, priority, anchored))
+        return self
+
+    def route(self, query):
+        """Return the best IntentMatch for the query, or None"""
+        lowered = query.lower()
+        tokens = [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(lowered)]
+        words = [token[0] for token in tokens]
+
+        best = None  # (priority, position, phrase words)
+        for position, word in enumerate(words):
+            for phrase, priority, anchored in self._index.get(word, ()):
+                if anchored and position != 0:
+                    continue
+                if best is not None and priority >= best[0]:
+                    continue
+                if tuple(words[position:position + len(phrase)]) == phrase:
+                    best = (priority, position, phrase)
+
+        if best is None:
+            return None
+
+        priority, position, phrase = best
+        intent, extract = self._intents[priority]
+        start = tokens[position][1]
+        end = tokens[position + len(phrase) - 1][2]
+        match = IntentMatch(intent, ' '.join(phrase), start, end, query)
+        if extract:
+            match.slots = extract(match) or {}
+        return match
+
+    def intent(self, query):
+        """Return just the intent name for the query, or None"""
+        match = self.route(query)
+        return match.intent if match else None
+
+
+def rest_slot(name):
+    """Slot extractor that captures the text after the matched phrase"""
+    def extract(match):
+        return {name: match.rest}
+    return extract
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import pyaudio
+
+from engine.stt import SAMPLE_RATE
+from engine.vad import VoiceActivityDetector, frameRMS
+
+
+class StreamingListener:
+    """Continuous microphone capture that streams speech to the recognizer
+
+    A capture thread keeps the microphone open and the noise floor up to date.
+    listen() starts feeding audio to the STT engine as soon as speech begins and
+    returns as soon as the speaker pauses.
+    """
+
+    def __init__(self, stt_service, frame_ms=30, end_silence_ms=500, preroll_ms=300):
+        self.stt_service = stt_service
+        self.vad = VoiceActivityDetector()
+        self.frame_ms = frame_ms
+        self.frame_samples = SAMPLE_RATE * frame_ms // 1000
+        self.end_silence_ms = end_silence_ms
+        self.preroll_frames = max(1, preroll_ms // frame_ms)
+
+        self._preroll = deque(maxlen=self.preroll_frames)
+        self._frames = queue.Queue()
+        self._listening = False
+        self._lock = threading.Lock()
+        self._running = False
+        self._paud = None
+        self._stream = None
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._paud = pyaudio.PyAudio()
+        self._stream = self._paud.open(rate=SAMPLE_RATE, channels=1, format=pyaudio.paInt16,
+                                       input=True, frames_per_buffer=self.frame_samples)
+        self._running = True
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._stream is not None:
+            self._stream.close()
+        if self._paud is not None:
+            self._paud.terminate()
+
+    def _capture(self):
+        while self._running:
+            frame = self._stream.read(self.frame_samples, exception_on_overflow=False)
+            speech = self.vad.isSpeech(frameRMS(frame))
+            with self._lock:
+                if self._listening:
+                    self._frames.put((frame, speech))
+                else:
+                    # Keep the last moments before listen() so the first syllable is not cut off
+                    self._preroll.append((frame, speech))
+
+    def listen(self, timeout=10, phrase_time_limit=6, on_partial=None):
+        """Return the transcript of the next utterance ('' if nobody spoke within timeout)"""
+        self.start()
+        with self._lock:
+            pending = deque(self._preroll, maxlen=self.preroll_frames)
+            self._preroll.clear()
+            self._frames = queue.Queue()
+            self._listening = True
+
+        recognition = None
+        silence_ms = 0
+        speech_ms = 0
+        started_at = time.monotonic()
+        try:
+            while True:
+                try:
+                    frame, speech = self._frames.get(timeout=0.1)
+                except queue.Empty:
+                    if recognition is None and time.monotonic() - started_at > timeout:
+                        return ''
+                    continue
+
+                if recognition is None:
+                    if not speech:
+                        pending.append((frame, speech))
+                        if time.monotonic() - started_at > timeout:
+                            return ''
+                        continue
+                    # Speech started: stream the pre-roll and everything after it
+                    recognition = self.stt_service.stream(SAMPLE_RATE)
+                    for buffered, _ in pending:
+                        recognition.feed(buffered)
+
+                partial = recognition.feed(frame)
+                if partial and on_partial:
+                    on_partial(partial)
+
+                speech_ms += self.frame_ms
+                silence_ms = 0 if speech else silence_ms + self.frame_ms
+                # End of utterance as soon as the speaker pauses
+                if silence_ms >= self.end_silence_ms or speech_ms >= phrase_time_limit * 1000:
+                    break
+        finally:
+            with self._lock:
+                self._listening = False
+
+        return recognition.finish()
@@ -0,0 +1,318 @@
+import subprocess
+import time
+from collections import deque
+
+try:
+    import pyautogui
+    pyautogui_available = True
+except ImportError:
+    pyautogui_available = False
+
+try:
+    import pygetwindow
+    pygetwindow_available = True
+except ImportError:
+    pygetwindow_available = False
+
+
+class MacroError(Exception):
+    """A required step of a macro did not reach its condition in time"""
+
+
+def _format(value, context):
+    return value.format(**context) if isinstance(value, str) else value
+
+
+# Conditions: called with the macro context, true once the screen is in the wanted state.
+# available() is false when the condition cannot be checked here (missing package),
+# in which case the step falls back to a fixed delay like the old code.
+
+class Condition:
+    def available(self):
+        return True
+
+    def __call__(self, context):
+        raise NotImplementedError
+
+
+class Check(Condition):
+    """Any callable(context) used as a condition"""
+
+    def __init__(self, check):
+        self.check = check
+
+    def __call__(self, context):
+        return bool(self.check(context))
+
+
+class Not(Condition):
+    def __init__(self, condition):
+        self.condition = condition
+
+    def available(self):
+        return self.condition.available()
+
+    def __call__(self, context):
+        return not self.condition(context)
+
+
+class WindowTitle(Condition):
+    """The active (or any, with active=False) desktop window's title contains title"""
+
+    def __init__(self, title, active=True):
+        self.title = title
+        self.active = active
+
+    def available(self):
+        return pygetwindow_available
+
+    def __call__(self, context):
+        title = _format(self.title, context).lower()
+        if self.active:
+            window = pygetwindow.getActiveWindow()
+            return window is not None and title in window.title.lower()
+        return any(title in t.lower() for t in pygetwindow.getAllTitles())
+
+
+def _changed(before, after, tolerance):
+    """Share of pixels that differ noticeably between two screenshots is above tolerance"""
+    from PIL import ImageChops  # Pillow comes with pyautogui
+    if before.size != after.size:
+        return True
+    diff = ImageChops.difference(before.convert('L'), after.convert('L')).point(lambda v: 255 if v > 24 else 0)
+    return diff.histogram()[255] > tolerance * before.size[0] * before.size[1]
+
+
+class ScreenChanged(Condition):
+    """The screen area saved by snapshot(key) looks different now and has stopped changing
+
+    Waiting for the change to settle lets a chat finish loading instead of
+    acting on the first frame of the switch; a cursor blink is below tolerance.
+    """
+
+    def __init__(self, key='screen', tolerance=0.01):
+        self.key = key
+        self.tolerance = tolerance
+
+    def available(self):
+        return pyautogui_available
+
+    def __call__(self, context):
+        before, region = context[self.key]
+        now = pyautogui.screenshot(region=region)
+        previous = context.get(self.key + '_last')
+        context[self.key + '_last'] = now
+        return (_changed(before, now, self.tolerance) and previous is not None
+                and not _changed(previous, now, self.tolerance))
+
+
+class FocusedApp(Condition):
+    """The phone's focused window belongs to package ('home' for the launcher)"""
+
+    def __init__(self, package):
+        self.package = package
+
+    def __call__(self, context):
+        device = context['device']
+        package = device.homePackage() if self.package == 'home' else _format(self.package, context)
+        return bool(package) and device.focusedWindow().startswith(package + '/')
+
+
+class KeyboardShown(Condition):
+    def __call__(self, context):
+        return context['device'].keyboardShown()
+
+
+class UiElement(Condition):
+    """A node with this text / content description / resource id is on the phone's screen"""
+
+    def __init__(self, text=None, description=None, resource_id=None):
+        self.text = text
+        self.description = description
+        self.resource_id = resource_id
+
+    def __call__(self, context):
+        return context['device'].findElement(_format(self.text, context), _format(self.description, context),
+                                             self.resource_id) is not None
+
+
+# Actions: called with the macro context.
+
+def snapshot(key='screen', window=None):
+    """Save a screenshot for ScreenChanged(key); only the active window's area if its title contains window"""
+    def action(context):
+        region = None
+        if window and pygetwindow_available:
+            active = pygetwindow.getActiveWindow()
+            if active is not None and _format(window, context).lower() in active.title.lower():
+                region = (active.left, active.top, active.width, active.height)
+        context[key] = (pyautogui.screenshot(region=region), region)
+        context.pop(key + '_last', None)
+    return action
+
+def openUrl(url):
+    """Open a URL (or app protocol link) with the Windows shell, like double clicking it"""
+    def action(context):
+        subprocess.run(f'start "" "{_format(url, context)}"', shell=True)
+    return action
+
+
+def hotkey(*keys):
+    def action(context):
+        pyautogui.hotkey(*keys)
+    return action
+
+
+def press(key, presses=1):
+    """Press key presses times (presses may be a context name, e.g. 'target_tab')"""
+    def action(context):
+        count = context[presses] if isinstance(presses, str) else presses
+        pyautogui.press(key, presses=count, interval=0.05)
+    return action
+
+
+def keyEvents(*key_codes):
+    def action(context):
+        context['device'].keyEvents(*key_codes)
+    return action
+
+
+def typeText(text):
+    def action(context):
+        context['device'].text(_format(text, context))
+    return action
+
+
+def tapElement(text=None, description=None, resource_id=None, fallback=None):
+    """Tap a UI element found by text / description / id, or the fallback (x, y) if it is not on screen
+
+    The element is looked up in the last dump when nothing was typed or tapped
+    since (e.g. the previous step's UiElement check). Without one, a position
+    found on an earlier run is tapped right away instead of dumping the screen.
+    """
+    known = {}
+
+    def action(context):
+        device = context['device']
+        position = None
+        query = (_format(text, context), _format(description, context), resource_id)
+        if any(query):
+            if not device.dumpCached and query in known:
+                position = known[query]
+            else:
+                position = device.findElement(*query, cached=True)
+                if position is not None:
+                    known[query] = position
+        position = position or fallback
+        if position is None:
+            raise MacroError(f"nothing to tap: {text or description or resource_id} is not on screen")
+        device.tap(*position)
+    return action
+
+
+class Step:
+    """One macro step: optionally wait for a precondition, act, then wait for the result
+
+    when:     skip the step unless this holds (e.g. do not launch an app that is already open)
+    wait:     precondition polled before the action
+    until:    postcondition polled after the action
+    timeout:  seconds to poll each condition
+    fallback: fixed delay used instead of a condition that cannot be checked here
+    required: raise MacroError on a timeout instead of carrying on
+    """
+
+    def __init__(self, name, action=None, when=None, wait=None, until=None, timeout=5.0, fallback=0.0,
+                 required=False):
+        self.name = name
+        self.action = action
+        self.when = Check(when) if when is not None and not isinstance(when, Condition) else when
+        self.wait = Check(wait) if wait is not None and not isinstance(wait, Condition) else wait
+        self.until = Check(until) if until is not None and not isinstance(until, Condition) else until
+        self.timeout = timeout
+        self.fallback = fallback
+        self.required = required
+
+    def _poll(self, condition, context, poll_interval):
+        """'met', 'timeout' or 'fallback'"""
+        if condition is None:
+            return 'met'
+        if not condition.available():
+            time.sleep(self.fallback)
+            return 'fallback'
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if condition(context):
+                    return 'met'
+            except Exception as e:
+                print(f"⚠️ Macro step '{self.name}': condition failed: {e}")
+            if time.monotonic() >= deadline:
+                if self.required:
+                    raise MacroError(f"step '{self.name}' timed out after {self.timeout}s")
+                return 'timeout'
+            time.sleep(poll_interval)
+
+    def run(self, context, poll_interval=0.1):
+        """Run the step and return its timings"""
+        timing = {'step': self.name, 'status': 'ok'}
+        started = time.perf_counter()
+        if self.when is not None and self.when.available() and not self.when(context):
+            timing['status'] = 'skipped'
+            return timing
+
+        statuses = [self._poll(self.wait, context, poll_interval)]
+        timing['wait_s'] = round(time.perf_counter() - started, 3)
+        if self.action is not None:
+            self.action(context)
+        acted = time.perf_counter()
+        timing['action_s'] = round(acted - started - timing['wait_s'], 3)
+        statuses.append(self._poll(self.until, context, poll_interval))
+        timing['until_s'] = round(time.perf_counter() - acted, 3)
+        for status in ('timeout', 'fallback'):
+            if status in statuses:
+                timing['status'] = status
+                break
+        return timing
+
+
+class Macro:
+    """A named, declarative list of Steps run against a context dict
+
+    Each step acts as soon as its precondition holds instead of after the
+    worst-case sleep, and every run's per-step timings are kept in runs.
+    """
+
+    def __init__(self, name, steps, poll_interval=0.1, keep=20):
+        self.name = name
+        self.steps = list(steps)
+        self.poll_interval = poll_interval
+        self.runs = deque(maxlen=keep)
+
+    def run(self, **context):
+        record = {'macro': self.name, 'steps': [], 'ok': False}
+        started = time.perf_counter()
+        try:
+            for step in self.steps:
+                record['steps'].append(step.run(context, self.poll_interval))
+            record['ok'] = True
+        except MacroError as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['elapsed_s'] = round(time.perf_counter() - started, 3)
+            self.runs.append(record)
+            steps = ', '.join(f"{s['step']} {s.get('wait_s', 0) + s.get('action_s', 0) + s.get('until_s', 0):.2f}s"
+                              + ('' if s['status'] == 'ok' else f" ({s['status']})") for s in record['steps'])
+            print(f"⏱️ {self.name}: {record['elapsed_s']:.2f}s [{steps}]")
+        return record
+
+    def stats(self):
+        """Average seconds per step over the recorded runs"""
+        totals = {}
+        for record in self.runs:
+            for s in record['steps']:
+                if s['status'] != 'skipped':
+                    total = totals.setdefault(s['step'], [0.0, 0])
+                    total[0] += s['wait_s'] + s['action_s'] + s['until_s']
+                    total[1] += 1
+        return {'runs': len(self.runs), 'steps': {name: round(t / n, 3) for name, (t, n) in totals.items()}}
@@ -0,0 +1,164 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import speech_recognition as sr
+    speech_recognition_available = True
+except ImportError:
+    speech_recognition_available = False
+
+try:
+    import vosk
+    vosk_available = True
+except ImportError:
+    vosk_available = False
+
+
+# Audio handed to the engines is raw 16 kHz mono 16-bit PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class STTError(Exception):
+    """The speech-to-text engine could not be reached or failed"""
+
+
+class BufferedStream:
+    """Incremental interface for engines that can only recognize whole phrases"""
+
+    def __init__(self, engine, sample_rate=SAMPLE_RATE):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.chunks = []
+
+    def feed(self, pcm):
+        """Add audio; returns a partial transcript when the engine has one (never here)"""
+        self.chunks.append(pcm)
+        return None
+
+    def finish(self):
+        """Recognize everything fed so far and return the transcript"""
+        return self.engine.transcribe(b''.join(self.chunks), self.sample_rate)
+
+
+class VoskStream:
+    """Feeds audio to a Vosk recognizer while the user is still speaking"""
+
+    def __init__(self, model, sample_rate=SAMPLE_RATE):
+        self.recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        self.text = []
+
+    def feed(self, pcm):
+        """Add audio; returns the current partial transcript"""
+        if self.recognizer.AcceptWaveform(pcm):
+            # Vosk finalised a segment (it found a pause inside the phrase)
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.text.append(text)
+            return ' '.join(self.text)
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self.text + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        return ' '.join(self.text + ([text] if text else []))
+
+
+class GoogleSpeechEngine:
+    """Google Web Speech API through speech_recognition (needs internet)"""
+
+    name = 'google'
+
+    def __init__(self, language='en-US', key=None):
+        if not speech_recognition_available:
+            raise STTError("SpeechRecognition is not installed")
+        self.language = language
+        self.key = key or os.environ.get('GOOGLE_SPEECH_KEY') or None  # None: speech_recognition's default
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate=SAMPLE_RATE, language=None):
+        """Return the transcript of the PCM audio ('' if nothing was understood)"""
+        audio = sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH)
+        try:
+            return self.recognizer.recognize_google(audio, key=self.key, language=language or self.language)
+        except sr.UnknownValueError:
+            return ''
+        except sr.RequestError as e:
+            raise STTError(str(e))
+
+
+class VoskSpeechEngine:
+    """Offline CPU recognizer; the model is loaded once and stays in memory"""
+
+    name = 'vosk'
+
+    def __init__(self, model_path):
+        if not vosk_available:
+            raise STTError("vosk is not installed")
+        if not model_path or not os.path.isdir(model_path):
+            raise STTError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+
+    def transcribe(self, pcm, sample_rate=SAMPLE_RATE, language=None):
+        """Return the transcript of the PCM audio ('' if nothing was understood)"""
+        # Recognizers are cheap; the expensive part is the shared model
+        recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get('text', '')
+
+    def stream(self, sample_rate=SAMPLE_RATE):
+        """Recognizer for feeding audio incrementally while the user speaks"""
+        return VoskStream(self.model, sample_rate)
+
+
+class STTService:
+    """Runs one resident engine on a bounded pool of decoding workers"""
+
+    def __init__(self, engine, workers=2):
+        self.engine = engine
+        self.name = engine.name
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stt')
+
+    def submit(self, pcm, sample_rate=SAMPLE_RATE, language=None):
+        """Queue audio for recognition and return a Future with the transcript"""
+        return self.pool.submit(self.engine.transcribe, pcm, sample_rate, language)
+
+    def transcribe(self, pcm, sample_rate=SAMPLE_RATE, language=None, timeout=None):
+        """Recognize audio on the worker pool and wait for the transcript"""
+        return self.submit(pcm, sample_rate, language).result(timeout=timeout)
+
+    def stream(self, sample_rate=SAMPLE_RATE):
+        """Start incremental recognition (buffered for engines that cannot stream)"""
+        if hasattr(self.engine, 'stream'):
+            return self.engine.stream(sample_rate)
+        return BufferedStream(self.engine, sample_rate)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+
+
+def createSTTService(engine=None, language='en-US'):
+    """Build the configured engine (STT_ENGINE = google | vosk | auto)
+
+    auto uses Vosk when a model is available and falls back to Google.
+    """
+    engine = (engine or os.environ.get('STT_ENGINE', 'auto')).lower()
+    model_path = os.environ.get('VOSK_MODEL_PATH', os.path.join(os.path.dirname(__file__), 'models', 'vosk'))
+    workers = int(os.environ.get('STT_WORKERS', 2))
+
+    if engine in ('vosk', 'auto'):
+        try:
+            service = STTService(VoskSpeechEngine(model_path), workers)
+            print(f"✅ Offline speech recognition (Vosk) loaded from {model_path}")
+            return service
+        except STTError as e:
+            if engine == 'vosk':
+                print(f"⚠️ Vosk unavailable ({e}), using Google speech recognition")
+
+    try:
+        return STTService(GoogleSpeechEngine(language), workers)
+    except STTError as e:
+        print(f"⚠️ Speech recognition not available: {e}")
+        return None
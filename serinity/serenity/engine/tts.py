@@ -0,0 +1,175 @@
+import itertools
+import queue
+import threading
+import time
+
+import pyttsx3
+
+from engine.tts_cache import BackgroundRenderer, startPlayback
+
+
+class Utterance:
+    """One queued piece of speech; done is set once it finished or was cancelled"""
+
+    def __init__(self, name, text, on_done=None):
+        self.name = name
+        self.text = text
+        self.on_done = on_done
+        self.completed = False
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class SpeechService:
+    """Long-lived text-to-speech engine fed by a queue
+
+    The pyttsx3 engine is created once on its own thread (SAPI5 must be used
+    from the thread that created it) and driven with an external loop, so
+    speech can be cancelled between iterations for barge-in. say() returns
+    immediately.
+
+    With a SpeechAudioCache, phrases that were synthesized before are replayed
+    from disk; new ones are spoken live and, once the cache admits them,
+    rendered by a separate process so a cache fill never delays speech.
+    """
+
+    def __init__(self, driver='sapi5', voice_index=0, rate=174, cache=None):
+        self.driver = driver
+        self.voice_index = voice_index
+        self.rate = rate
+        self.cache = cache
+        self.renderer = BackgroundRenderer(cache, driver) if cache is not None else None
+        self.voice_id = None
+        self._channel = None     # pygame channel while replaying cached audio
+        self._queue = queue.Queue()
+        self._current = None
+        self._cancel = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._ready = threading.Event()
+        self._failed = False
+        self._names = itertools.count()
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()  # keeps _idle consistent with the queue
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._ready.wait()
+
+    def say(self, text, on_done=None, interrupt=False):
+        """Queue text to be spoken; on_done(completed) is called when it ends"""
+        self.start()
+        if interrupt:
+            self.cancel()
+        utterance = Utterance(f"utterance-{next(self._names)}", str(text), on_done)
+        if self._failed:
+            print(f"Speech output: {utterance.text}")
+            self._finish(utterance, completed=False)
+            return utterance
+        with self._state_lock:
+            self._idle.clear()
+            self._queue.put(utterance)
+        return utterance
+
+    def cancel(self):
+        """Stop the current utterance and drop everything queued (barge-in)"""
+        while True:
+            try:
+                self._finish(self._queue.get_nowait(), completed=False)
+            except queue.Empty:
+                break
+        if self._current is not None:
+            self._cancel.set()
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken"""
+        return self._idle.wait(timeout)
+
+    @property
+    def speaking(self):
+        return not self._idle.is_set()
+
+    def _run(self):
+        try:
+            engine = pyttsx3.init(self.driver)
+            voices = engine.getProperty('voices')
+            if voices:
+                self.voice_id = voices[min(self.voice_index, len(voices) - 1)].id
+                engine.setProperty('voice', self.voice_id)
+            engine.setProperty('rate', self.rate)
+            engine.connect('finished-utterance', self._onFinished)
+            engine.startLoop(False)
+        except Exception as e:
+            print(f"speech engine initialization failed: {e}")
+            self._failed = True
+            return
+        finally:
+            self._ready.set()
+
+        while True:
+            if self._cancel.is_set():
+                self._cancel.clear()
+                if self._channel is not None:
+                    self._channel.stop()
+                    self._channel = None
+                else:
+                    engine.stop()
+                if self._current is not None:
+                    self._finish(self._current, completed=False)
+
+            if self._current is None:
+                try:
+                    self._current = self._queue.get(timeout=0.05)
+                except queue.Empty:
+                    with self._state_lock:
+                        if self._queue.empty():
+                            self._idle.set()
+                    continue
+                self._startUtterance(engine, self._current)
+
+            if self._channel is not None:
+                if not self._channel.get_busy():
+                    self._channel = None
+                    self._finish(self._current, completed=True)
+            else:
+                engine.iterate()
+            time.sleep(0.01)
+
+    def _startUtterance(self, engine, utterance):
+        cacheable = self.cache is not None and self.cache.cacheable(utterance.text)
+        if cacheable:
+            path = self.cache.lookup(utterance.text, self.voice_id, self.rate)
+            if path:
+                try:
+                    self._channel = startPlayback(path)
+                    if self._channel is not None:
+                        return
+                except Exception as e:
+                    print(f"cached speech playback failed: {e}")
+        engine.say(utterance.text, utterance.name)
+        if cacheable and self.cache.admit(utterance.text):
+            self.renderer.submit(utterance.text, self.voice_id, self.rate)
+
+    def _onFinished(self, name, completed):
+        current = self._current
+        if current is not None and current.name == name:
+            self._finish(current, completed)
+
+    def _finish(self, utterance, completed):
+        if utterance is self._current:
+            self._current = None
+        if utterance.done.is_set():
+            return
+        utterance.completed = completed
+        utterance.done.set()
+        if utterance.on_done:
+            try:
+                utterance.on_done(completed)
+            except Exception as e:
+                print(f"speech callback error: {e}")
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+try:
+    import pygame
+    pygame_available = True
+except ImportError:
+    pygame_available = False
+
+
+# pyttsx3 writes AIFF on macOS (NSSpeechSynthesizer) and WAV everywhere else
+AUDIO_EXTENSION = '.aiff' if sys.platform == 'darwin' else '.wav'
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')
+
+
+class SpeechAudioCache:
+    """Content-addressed on-disk store of synthesized speech
+
+    Audio is keyed on text + voice + rate, so a phrase is synthesized once and
+    replayed afterwards. Only short phrases that are pinned or were heard
+    min_uses times are admitted, so one-off AI replies do not push out the
+    fixed prompts. The least recently played files are evicted when the store
+    grows past max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=50 * 1024 * 1024, max_text_length=120,
+                 min_uses=2, phrases=(), max_tracked=4096):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_text_length = max_text_length
+        self.min_uses = min_uses
+        self.phrases = {self.normalize(p) for p in phrases}
+        self.max_tracked = max_tracked
+        self._uses = OrderedDict()  # phrase -> times heard, most recent last
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._files())
+
+    @classmethod
+    def fromEnv(cls):
+        return cls(
+            directory=os.environ.get('TTS_CACHE_DIR', DEFAULT_CACHE_DIR),
+            max_bytes=int(float(os.environ.get('TTS_CACHE_MAX_MB', 50)) * 1024 * 1024),
+            max_text_length=int(os.environ.get('TTS_CACHE_MAX_TEXT', 120)),
+            min_uses=int(os.environ.get('TTS_CACHE_MIN_USES', 2)),
+            phrases=[p for p in os.environ.get('TTS_CACHE_PHRASES', '').split('|') if p.strip()],
+        )
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(str(text).split())
+
+    def key(self, text, voice, rate):
+        raw = '\x1f'.join([self.normalize(text), str(voice or ''), str(rate)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], key + AUDIO_EXTENSION)
+
+    def cacheable(self, text):
+        return 0 < len(str(text).strip()) <= self.max_text_length
+
+    def admit(self, text):
+        """Count one more use of a phrase; True once it is worth rendering into the cache"""
+        if not self.cacheable(text):
+            return False
+        phrase = self.normalize(text)
+        if phrase in self.phrases:
+            return True
+        with self._lock:
+            uses = self._uses.pop(phrase, 0) + 1
+            self._uses[phrase] = uses
+            if len(self._uses) > self.max_tracked:
+                self._uses.popitem(last=False)
+        return uses >= self.min_uses
+
+    def lookup(self, text, voice, rate):
+        """Path of the cached audio for this phrase, or None"""
+        path = self.path(self.key(text, voice, rate))
+        try:
+            # Bump the mtime so eviction drops the least recently played first
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return path
+
+    def reserve(self, text, voice, rate):
+        """Temporary path to synthesize into; pass it to commit() when written"""
+        final = self.path(self.key(text, voice, rate))
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        return f"{final}.{uuid.uuid4().hex[:8]}.tmp{AUDIO_EXTENSION}"
+
+    def commit(self, temp_path, text, voice, rate):
+        """Move a rendered file into the store and evict if over budget"""
+        if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+        final = self.path(self.key(text, voice, rate))
+        size = os.path.getsize(temp_path)
+        with self._lock:
+            if os.path.exists(final):
+                self._size -= os.path.getsize(final)
+            os.replace(temp_path, final)
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+        return final
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if '.tmp' in name:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Drop least recently played files until we are back under 90% of the budget
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._files(), key=lambda f: f[2]):
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'bytes': self._size, 'max_bytes': self.max_bytes}
+
+
+class BackgroundRenderer:
+    """Fills a SpeechAudioCache from a separate process with its own speech engine
+
+    Rendering never takes the caller's engine or lock, so live speech is not
+    held up by a cache fill. Jobs run one at a time in submission order.
+    """
+
+    def __init__(self, cache, driver=None):
+        self.cache = cache
+        self.driver = driver
+        self._jobs = queue.Queue()
+        self._pending = {}  # cache key -> Future of the render
+        self._lock = threading.Lock()
+        self._thread = None
+        self._process = None
+        self.rendered = 0
+        self.failed = 0
+
+    def submit(self, text, voice, rate):
+        """Queue a render (or join the one already queued); returns a Future of the cached path"""
+        key = self.cache.key(text, voice, rate)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pending[key] = Future()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._jobs.put((key, text, voice, rate, future))
+        return future
+
+    def _run(self):
+        while True:
+            key, text, voice, rate, future = self._jobs.get()
+            temp_path = self.cache.reserve(text, voice, rate)
+            try:
+                self._render({'text': text, 'voice': voice, 'rate': rate, 'path': temp_path, 'driver': self.driver})
+                path = self.cache.commit(temp_path, text, voice, rate)
+                self.rendered += path is not None
+                future.set_result(path)
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️ Speech cache render failed: {e}")
+                self._stopWorker()
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+    def _render(self, job):
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE, text=True,
+                                             env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1'))
+        self._process.stdin.write(json.dumps(job) + '\n')
+        self._process.stdin.flush()
+        for line in self._process.stdout:
+            if line.startswith('ok'):
+                return
+            if line.startswith('error:'):
+                raise RuntimeError(line[6:].strip())
+        raise RuntimeError("render process exited")
+
+    def _stopWorker(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def stats(self):
+        return {'rendered': self.rendered, 'failed': self.failed, 'pending': len(self._pending)}
+
+
+def _renderWorker():
+    """Render process: one JSON job per line on stdin, 'ok' or 'error: ...' per job on stdout"""
+    import pyttsx3
+    engine = None
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            if engine is None:
+                engine = pyttsx3.init(job['driver']) if job.get('driver') else pyttsx3.init()
+            if job.get('voice'):
+                engine.setProperty('voice', job['voice'])
+            if job.get('rate'):
+                engine.setProperty('rate', job['rate'])
+            engine.save_to_file(job['text'], job['path'])
+            engine.runAndWait()
+            print('ok', flush=True)
+        except Exception as e:
+            print('error: ' + ' '.join(str(e).split()), flush=True)
+
+
+def audioMimeType(path):
+    with open(path, 'rb') as f:
+        header = f.read(4)
+    return 'audio/aiff' if header == b'FORM' else 'audio/wav'
+
+
+def startPlayback(path):
+    """Start playing a cached file with pygame; returns the channel (None if unavailable)"""
+    if not pygame_available:
+        return None
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    return pygame.mixer.Sound(path).play()
+
+
+def playAudio(path, stop_event=None):
+    """Play a cached file and wait for it (returns False if it could not play or was stopped)"""
+    channel = startPlayback(path)
+    if channel is None:
+        return False
+    while channel is not None and channel.get_busy():
+        if stop_event is not None and stop_event.is_set():
+            channel.stop()
+            return False
+        time.sleep(0.01)
+    return True
+
+
+if __name__ == '__main__':
+    _renderWorker()
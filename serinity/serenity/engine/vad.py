@@ -0,0 +1,44 @@
+import math
+from array import array
+
+try:
+    import numpy as np
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+
+def frameRMS(frame):
+    """Root-mean-square energy of a frame of 16-bit PCM"""
+    if numpy_available:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+    samples = array('h', frame)
+    return math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0.0
+
+
+class VoiceActivityDetector:
+    """Energy VAD with a rolling noise-floor estimate
+
+    The noise floor follows the energy of non-speech frames, so there is no
+    separate ambient-noise calibration step before listening.
+    """
+
+    def __init__(self, speech_ratio=3.0, min_energy=300, adapt_rate=0.05):
+        self.speech_ratio = speech_ratio  # speech must be this many times louder than the floor
+        self.min_energy = min_energy      # ...and at least this loud
+        self.adapt_rate = adapt_rate
+        self.noise_floor = None
+
+    @property
+    def threshold(self):
+        return max((self.noise_floor or 0) * self.speech_ratio, self.min_energy)
+
+    def isSpeech(self, rms):
+        if self.noise_floor is None:
+            self.noise_floor = rms
+            return False
+        speech = rms > self.threshold
+        if not speech:
+            self.noise_floor += self.adapt_rate * (rms - self.noise_floor)
+        return speech
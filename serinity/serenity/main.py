@@ -1,12 +1,32 @@
 import os
+import subprocess
+import time
 import eel
 
-from engine.features import *
-from engine.command import *
+# importing engine.features and engine.command also registers their eel exposed functions
+from engine.command import command_lock, runCommand, speak, speech_service
+from engine.features import playAssistantSound, startAssistantSound
 from engine.auth import recoganize
-def start():
+from engine.contacts import getContactSearch
+from engine.events import EventConsumer
+
+def onWake(event):
+    # a wake word while a command is running is ignored
+    if not command_lock.acquire(blocking=False):
+        return
+    try:
+        print(f"hotword '{event['keyword']}' -> listening after {(time.time() - event['timestamp']) * 1000:.0f} ms")
+        startAssistantSound()
+        eel.ShowSiriWave()
+        runCommand()
+    finally:
+        command_lock.release()
+
+def start(events=None):
     
     eel.init("serenity/www")
+    recoganize.warmUp()
+    getContactSearch().warmUp()
 
     playAssistantSound()
     @eel.expose
@@ -21,7 +41,11 @@ def start():
             eel.hideFaceAuthSuccess()
             speak("Hello, Welcome Sir, How can i Help You")
             eel.hideStart()
+            speech_service.wait()
             playAssistantSound()
+            if events is not None:
+                # wake words from the hotword process start a command directly
+                EventConsumer(events, spawn=eel.spawn, sleep=eel.sleep).on('wake', onWake).start()
         else:
             speak("Face Authentication Fail")
     os.system('start msedge.exe --app="http://localhost:8000/index.html"')
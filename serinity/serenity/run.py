@@ -4,24 +4,28 @@ import multiprocessing
 import subprocess
 
 # To run Serenity
-def startSerenity():
+def startSerenity(events):
         # Code for process 1
         print("Process 1 is running.")
         from main import start
-        start()
+        start(events)
 
 # To run hotword
-def listenHotword():
+def listenHotword(events):
         # Code for process 2
         print("Process 2 is running.")
-        from engine.features import hotword
-        hotword()
+        # engine.hotword keeps this process light: no STT model, no speech engine
+        from engine.hotword import listen
+        listen(events)
 
 
     # Start both processes
 if __name__ == '__main__':
-        p1 = multiprocessing.Process(target=startSerenity)
-        p2 = multiprocessing.Process(target=listenHotword)
+        # wake events go from the hotword process to the assistant
+        from engine.events import createChannel
+        events = createChannel()
+        p1 = multiprocessing.Process(target=startSerenity, args=(events,))
+        p2 = multiprocessing.Process(target=listenHotword, args=(events,))
         p1.start()
         p2.start()
         p1.join()
@@ -18,6 +18,13 @@ $(document).ready(function () {
         $("#SiriWave").attr("hidden", true);
     }
 
+    // Display siri wave (hotword detected)
+    eel.expose(ShowSiriWave)
+    function ShowSiriWave() {
+        $("#Oval").attr("hidden", true);
+        $("#SiriWave").attr("hidden", false);
+    }
+
     eel.expose(senderText)
     function senderText(message) {
         var chatBox = document.getElementById("chat-canvas-body");